@@ -1,6 +1,7 @@
 """Accept all tracked changes in a DOCX file using LibreOffice.
 
-Requires LibreOffice (soffice) to be installed.
+Requires LibreOffice (soffice) to be installed. Callers converting many
+files can pass an office.soffice.SofficePool so LibreOffice starts once.
 """
 
 import argparse
@@ -9,7 +10,7 @@ import shutil
 import subprocess
 from pathlib import Path
 
-from office.soffice import get_soffice_env
+from office.soffice import SofficeWorker, get_soffice_env
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,7 @@ ACCEPT_CHANGES_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
 def accept_changes(
     input_file: str,
     output_file: str,
+    pool=None,
 ) -> tuple[None, str]:
     input_path = Path(input_file)
     output_path = Path(output_file)
@@ -52,6 +54,16 @@ def accept_changes(
     except Exception as e:
         return None, f"Error: Failed to copy input file to output location: {e}"
 
+    if pool is not None:
+        try:
+            pool.submit(_accept_with_worker, output_path).result()
+        except Exception as e:
+            return None, f"Error: LibreOffice failed: {e}"
+        return (
+            None,
+            f"Successfully accepted all tracked changes: {input_file} -> {output_file}",
+        )
+
     if not _setup_libreoffice_macro():
         return None, "Error: Failed to setup LibreOffice macro"
 
@@ -88,6 +100,15 @@ def accept_changes(
     )
 
 
+def _accept_with_worker(worker: SofficeWorker, path: Path) -> None:
+    worker.process_document(
+        path,
+        lambda worker, document: worker.dispatch(
+            document, ".uno:AcceptAllTrackedChanges"
+        ),
+    )
+
+
 def _setup_libreoffice_macro() -> bool:
     macro_dir = Path(MACRO_DIR)
     macro_file = macro_dir / "Module1.xba"
@@ -3,6 +3,12 @@
 Usage:
     python comment.py unpacked/ 0 "Comment text"
     python comment.py unpacked/ 1 "Reply text" --parent 0
+    python comment.py unpacked/ --from-json comments.json
+
+The JSON file is a list of objects with the CommentSpec fields, e.g.
+    [{"comment_id": 0, "text": "Check this"},
+     {"comment_id": 1, "text": "Agreed", "parent_id": 0, "author": "Reviewer"}]
+All comments in the file are added with one read and one write per part.
 
 Text should be pre-escaped XML (e.g., &amp; for &, &#x2019; for smart quotes).
 
@@ -14,9 +20,10 @@ After running, add markers to document.xml:
 """
 
 import argparse
+import json
 import random
-import shutil
 import sys
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -31,6 +38,13 @@ NS = {
     "w16cex": "http://schemas.microsoft.com/office/word/2018/wordml/cex",
 }
 
+COMMENT_PARTS = (
+    ("comments.xml", "w:comments"),
+    ("commentsExtended.xml", "w15:commentsEx"),
+    ("commentsIds.xml", "w16cid:commentsIds"),
+    ("commentsExtensible.xml", "w16cex:commentsExtensible"),
+)
+
 COMMENT_XML = """\
 <w:comment w:id="{id}" w:author="{author}" w:date="{date}" w:initials="{initials}">
   <w:p w14:paraId="{para_id}" w14:textId="77777777">
@@ -83,26 +97,31 @@ def _encode_smart_quotes(text: str) -> str:
     return text
 
 
-def _append_xml(xml_path: Path, root_tag: str, content: str) -> None:
-    dom = defusedxml.minidom.parseString(xml_path.read_text(encoding="utf-8"))
+def _append_fragments(dom, root_tag: str, content: str) -> None:
     root = dom.getElementsByTagName(root_tag)[0]
     ns_attrs = " ".join(f'xmlns:{k}="{v}"' for k, v in NS.items())
     wrapper_dom = defusedxml.minidom.parseString(f"<root {ns_attrs}>{content}</root>")
     for child in wrapper_dom.documentElement.childNodes:  
         if child.nodeType == child.ELEMENT_NODE:
             root.appendChild(dom.importNode(child, True))
+
+
+def _write_dom(xml_path: Path, dom) -> None:
     output = _encode_smart_quotes(dom.toxml(encoding="UTF-8").decode("utf-8"))
     xml_path.write_text(output, encoding="utf-8")
 
 
-def _find_para_id(comments_path: Path, comment_id: int) -> str | None:
-    dom = defusedxml.minidom.parseString(comments_path.read_text(encoding="utf-8"))
+def _index_para_ids(dom) -> dict[str, str]:
+    para_ids = {}
     for c in dom.getElementsByTagName("w:comment"):
-        if c.getAttribute("w:id") == str(comment_id):
-            for p in c.getElementsByTagName("w:p"):
-                if pid := p.getAttribute("w14:paraId"):
-                    return pid
-    return None
+        comment_id = c.getAttribute("w:id")
+        if comment_id in para_ids:
+            continue
+        for p in c.getElementsByTagName("w:p"):
+            if pid := p.getAttribute("w14:paraId"):
+                para_ids[comment_id] = pid
+                break
+    return para_ids
 
 
 def _get_next_rid(rels_path: Path) -> int:
@@ -215,6 +234,15 @@ def _ensure_comment_content_types(unpacked_dir: Path) -> None:
     ct_path.write_bytes(dom.toxml(encoding="UTF-8"))
 
 
+@dataclass
+class CommentSpec:
+    comment_id: int
+    text: str
+    author: str = "Claude"
+    initials: str = "C"
+    parent_id: int | None = None
+
+
 def add_comment(
     unpacked_dir: str,
     comment_id: int,
@@ -223,83 +251,120 @@ def add_comment(
     initials: str = "C",
     parent_id: int | None = None,
 ) -> tuple[str, str]:
+    para_ids, msg = add_comments(
+        unpacked_dir, [CommentSpec(comment_id, text, author, initials, parent_id)]
+    )
+    return (para_ids[0] if para_ids else ""), msg
+
+
+def add_comments(unpacked_dir: str, specs: list[CommentSpec]) -> tuple[list[str], str]:
     word = Path(unpacked_dir) / "word"
     if not word.exists():
-        return "", f"Error: {word} not found"
-
-    para_id, durable_id = _generate_hex_id(), _generate_hex_id()
+        return [], f"Error: {word} not found"
+    if not specs:
+        return [], "No comments to add"
+
+    first_comment = not (word / "comments.xml").exists()
+    doms = {
+        name: defusedxml.minidom.parseString(
+            (
+                word / name if (word / name).exists() else TEMPLATE_DIR / name
+            ).read_text(encoding="utf-8")
+        )
+        for name, _ in COMMENT_PARTS
+    }
+    known_para_ids = _index_para_ids(doms["comments.xml"])
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    comments = word / "comments.xml"
-    first_comment = not comments.exists()
+    fragments = {name: [] for name, _ in COMMENT_PARTS}
+    para_ids = []
+    messages = []
+    for spec in specs:
+        para_id, durable_id = _generate_hex_id(), _generate_hex_id()
+
+        parent_attr = ""
+        if spec.parent_id is not None:
+            parent_para = known_para_ids.get(str(spec.parent_id))
+            if not parent_para:
+                return [], f"Error: Parent comment {spec.parent_id} not found"
+            parent_attr = f' w15:paraIdParent="{parent_para}"'
+
+        fragments["comments.xml"].append(
+            COMMENT_XML.format(
+                id=spec.comment_id,
+                author=spec.author,
+                date=ts,
+                initials=spec.initials,
+                para_id=para_id,
+                text=spec.text,  
+            )
+        )
+        fragments["commentsExtended.xml"].append(
+            f'<w15:commentEx w15:paraId="{para_id}"{parent_attr} w15:done="0"/>'
+        )
+        fragments["commentsIds.xml"].append(
+            f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
+        )
+        fragments["commentsExtensible.xml"].append(
+            f'<w16cex:commentExtensible w16cex:durableId="{durable_id}" w16cex:dateUtc="{ts}"/>'
+        )
+
+        known_para_ids.setdefault(str(spec.comment_id), para_id)
+        para_ids.append(para_id)
+        action = "reply" if spec.parent_id is not None else "comment"
+        messages.append(f"Added {action} {spec.comment_id} (para_id={para_id})")
+
+    for name, root_tag in COMMENT_PARTS:
+        _append_fragments(doms[name], root_tag, "".join(fragments[name]))
+        _write_dom(word / name, doms[name])
+
     if first_comment:
-        shutil.copy(TEMPLATE_DIR / "comments.xml", comments)
         _ensure_comment_relationships(Path(unpacked_dir))
         _ensure_comment_content_types(Path(unpacked_dir))
-    _append_xml(
-        comments,
-        "w:comments",
-        COMMENT_XML.format(
-            id=comment_id,
-            author=author,
-            date=ts,
-            initials=initials,
-            para_id=para_id,
-            text=text,  
-        ),
-    )
-
-    ext = word / "commentsExtended.xml"
-    if not ext.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsExtended.xml", ext)
-    if parent_id is not None:
-        parent_para = _find_para_id(comments, parent_id)
-        if not parent_para:
-            return "", f"Error: Parent comment {parent_id} not found"
-        _append_xml(
-            ext,
-            "w15:commentsEx",
-            f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para}" w15:done="0"/>',
-        )
-    else:
-        _append_xml(
-            ext,
-            "w15:commentsEx",
-            f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>',
-        )
 
-    ids = word / "commentsIds.xml"
-    if not ids.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsIds.xml", ids)
-    _append_xml(
-        ids,
-        "w16cid:commentsIds",
-        f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>',
-    )
+    return para_ids, "\n".join(messages)
 
-    extensible = word / "commentsExtensible.xml"
-    if not extensible.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsExtensible.xml", extensible)
-    _append_xml(
-        extensible,
-        "w16cex:commentsExtensible",
-        f'<w16cex:commentExtensible w16cex:durableId="{durable_id}" w16cex:dateUtc="{ts}"/>',
-    )
 
-    action = "reply" if parent_id is not None else "comment"
-    return para_id, f"Added {action} {comment_id} (para_id={para_id})"
+def _load_comment_specs(json_path: str, author: str, initials: str) -> list[CommentSpec]:
+    with open(json_path, encoding="utf-8") as f:
+        entries = json.load(f)
+    return [
+        CommentSpec(**{"author": author, "initials": initials, **entry})
+        for entry in entries
+    ]
 
 
 if __name__ == "__main__":
     p = argparse.ArgumentParser(description="Add comments to DOCX documents")
     p.add_argument("unpacked_dir", help="Unpacked DOCX directory")
-    p.add_argument("comment_id", type=int, help="Comment ID (must be unique)")
-    p.add_argument("text", help="Comment text")
+    p.add_argument("comment_id", type=int, nargs="?", help="Comment ID (must be unique)")
+    p.add_argument("text", nargs="?", help="Comment text")
     p.add_argument("--author", default="Claude", help="Author name")
     p.add_argument("--initials", default="C", help="Author initials")
     p.add_argument("--parent", type=int, help="Parent comment ID (for replies)")
+    p.add_argument(
+        "--from-json",
+        metavar="FILE",
+        help="Add every comment listed in a JSON file (--author/--initials are defaults)",
+    )
     args = p.parse_args()
 
+    if args.from_json:
+        try:
+            specs = _load_comment_specs(args.from_json, args.author, args.initials)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Error: Could not load {args.from_json}: {e}")
+            sys.exit(1)
+        _, msg = add_comments(args.unpacked_dir, specs)
+        print(msg)
+        if "Error" in msg:
+            sys.exit(1)
+        print(COMMENT_MARKER_TEMPLATE.format(cid="N"))
+        sys.exit(0)
+
+    if args.comment_id is None or args.text is None:
+        p.error("comment_id and text are required unless --from-json is given")
+
     para_id, msg = add_comment(
         args.unpacked_dir,
         args.comment_id,
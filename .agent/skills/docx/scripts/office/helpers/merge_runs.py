@@ -1,120 +1,65 @@
 """Merge adjacent runs with identical formatting in DOCX.
 
 Merges adjacent <w:r> elements that have identical <w:rPr> properties.
-Works on runs in paragraphs and inside tracked changes (<w:ins>, <w:del>).
+Works on runs in paragraphs and inside tracked changes (<w:ins>, <w:del>),
+in the document body, headers, footers, footnotes and endnotes.
 
 Also:
 - Removes rsid attributes from runs (revision metadata that doesn't affect rendering)
 - Removes proofErr elements (spell/grammar markers that block merging)
+
+The per-element steps below are driven by helpers.normalize, which runs
+them in the same pass as tracked-change simplification.
 """
 
 from pathlib import Path
 
-import defusedxml.minidom
+from helpers.xml_format import XML_NAMESPACE, local_name, remove_element
+
+XML_SPACE = f"{{{XML_NAMESPACE}}}space"
 
 
 def merge_runs(input_dir: str) -> tuple[int, str]:
+    from helpers.normalize import normalize_document
+
     doc_xml = Path(input_dir) / "word" / "document.xml"
 
     if not doc_xml.exists():
         return 0, f"Error: {doc_xml} not found"
 
     try:
-        dom = defusedxml.minidom.parseString(doc_xml.read_text(encoding="utf-8"))
-        root = dom.documentElement
-
-        _remove_elements(root, "proofErr")
-        _strip_run_rsid_attrs(root)
-
-        containers = {run.parentNode for run in _find_elements(root, "r")}
-
-        merge_count = 0
-        for container in containers:
-            merge_count += _merge_runs_in(container)
-
-        doc_xml.write_bytes(dom.toxml(encoding="UTF-8"))
+        _, merge_count = normalize_document(input_dir, simplify_redlines=False)
         return merge_count, f"Merged {merge_count} runs"
 
     except Exception as e:
         return 0, f"Error: {e}"
 
 
+def remove_proof_errors(elem):
+    for child in list(elem):
+        if _is_element(child, "proofErr"):
+            remove_element(child)
 
 
-def _find_elements(root, tag: str) -> list:
-    results = []
-
-    def traverse(node):
-        if node.nodeType == node.ELEMENT_NODE:
-            name = node.localName or node.tagName
-            if name == tag or name.endswith(f":{tag}"):
-                results.append(node)
-            for child in node.childNodes:
-                traverse(child)
-
-    traverse(root)
-    return results
-
-
-def _get_child(parent, tag: str):
-    for child in parent.childNodes:
-        if child.nodeType == child.ELEMENT_NODE:
-            name = child.localName or child.tagName
-            if name == tag or name.endswith(f":{tag}"):
-                return child
-    return None
-
-
-def _get_children(parent, tag: str) -> list:
-    results = []
-    for child in parent.childNodes:
-        if child.nodeType == child.ELEMENT_NODE:
-            name = child.localName or child.tagName
-            if name == tag or name.endswith(f":{tag}"):
-                results.append(child)
-    return results
-
-
-def _is_adjacent(elem1, elem2) -> bool:
-    node = elem1.nextSibling
-    while node:
-        if node == elem2:
-            return True
-        if node.nodeType == node.ELEMENT_NODE:
-            return False
-        if node.nodeType == node.TEXT_NODE and node.data.strip():
-            return False
-        node = node.nextSibling
-    return False
-
-
-
-
-def _remove_elements(root, tag: str):
-    for elem in _find_elements(root, tag):
-        if elem.parentNode:
-            elem.parentNode.removeChild(elem)
-
+def strip_run_rsid_attrs(run):
+    for key in [key for key in run.attrib if "rsid" in key.rpartition("}")[2].lower()]:
+        del run.attrib[key]
 
-def _strip_run_rsid_attrs(root):
-    for run in _find_elements(root, "r"):
-        for attr in list(run.attributes.values()):
-            if "rsid" in attr.name.lower():
-                run.removeAttribute(attr.name)
 
-
-
-
-def _merge_runs_in(container) -> int:
+def merge_runs_in(container, fingerprints: dict) -> int:
     merge_count = 0
     run = _first_child_run(container)
 
-    while run:
+    while run is not None:
         while True:
             next_elem = _next_element_sibling(run)
-            if next_elem and _is_run(next_elem) and _can_merge(run, next_elem):
+            if (
+                next_elem is not None
+                and is_run(next_elem)
+                and _can_merge(run, next_elem, fingerprints)
+            ):
                 _merge_run_content(run, next_elem)
-                container.removeChild(next_elem)
+                remove_element(next_elem)
                 merge_count += 1
             else:
                 break
@@ -125,75 +70,111 @@ def _merge_runs_in(container) -> int:
     return merge_count
 
 
+def is_run(node) -> bool:
+    return _is_element(node, "r")
+
+
+def _is_element(node, tag: str) -> bool:
+    return isinstance(node.tag, str) and local_name(node) == tag
+
+
+def _get_child(parent, tag: str):
+    for child in parent:
+        if _is_element(child, tag):
+            return child
+    return None
+
+
+def _is_blank(text) -> bool:
+    return not text or not text.strip()
+
+
+def _is_adjacent(elem1, elem2) -> bool:
+    if not _is_blank(elem1.tail):
+        return False
+    node = elem1.getnext()
+    while node is not None:
+        if node is elem2:
+            return True
+        if isinstance(node.tag, str) or not _is_blank(node.tail):
+            return False
+        node = node.getnext()
+    return False
+
+
 def _first_child_run(container):
-    for child in container.childNodes:
-        if child.nodeType == child.ELEMENT_NODE and _is_run(child):
+    for child in container:
+        if is_run(child):
             return child
     return None
 
 
 def _next_element_sibling(node):
-    sibling = node.nextSibling
-    while sibling:
-        if sibling.nodeType == sibling.ELEMENT_NODE:
+    sibling = node.getnext()
+    while sibling is not None:
+        if isinstance(sibling.tag, str):
             return sibling
-        sibling = sibling.nextSibling
+        sibling = sibling.getnext()
     return None
 
 
 def _next_sibling_run(node):
-    sibling = node.nextSibling
-    while sibling:
-        if sibling.nodeType == sibling.ELEMENT_NODE:
-            if _is_run(sibling):
-                return sibling
-        sibling = sibling.nextSibling
+    sibling = node.getnext()
+    while sibling is not None:
+        if is_run(sibling):
+            return sibling
+        sibling = sibling.getnext()
     return None
 
 
-def _is_run(node) -> bool:
-    name = node.localName or node.tagName
-    return name == "r" or name.endswith(":r")
+def _can_merge(run1, run2, fingerprints: dict) -> bool:
+    return _run_fingerprint(run1, fingerprints) == _run_fingerprint(run2, fingerprints)
 
 
-def _can_merge(run1, run2) -> bool:
-    rpr1 = _get_child(run1, "rPr")
-    rpr2 = _get_child(run2, "rPr")
+def _run_fingerprint(run, fingerprints: dict) -> str:
+    fingerprint = fingerprints.get(run)
+    if fingerprint is None:
+        rpr = _get_child(run, "rPr")
+        fingerprint = "" if rpr is None else _canonical_form(rpr)
+        fingerprints[run] = fingerprint
+    return fingerprint
 
-    if (rpr1 is None) != (rpr2 is None):
-        return False
-    if rpr1 is None:
-        return True
-    return rpr1.toxml() == rpr2.toxml()  
+
+def _canonical_form(node) -> str:
+    # Control characters cannot occur in XML content, so they delimit safely.
+    parts = [node.tag]
+    if node.attrib:
+        parts.extend(f"{name}={value}" for name, value in sorted(node.attrib.items()))
+    if not _is_blank(node.text):
+        parts.append(node.text)
+    for child in node:
+        if isinstance(child.tag, str):
+            parts.append(f"\x02{_canonical_form(child)}\x03")
+        if not _is_blank(child.tail):
+            parts.append(child.tail)
+    return "\x1f".join(parts)
 
 
 def _merge_run_content(target, source):
-    for child in list(source.childNodes):
-        if child.nodeType == child.ELEMENT_NODE:
-            name = child.localName or child.tagName
-            if name != "rPr" and not name.endswith(":rPr"):
-                target.appendChild(child)
+    for child in list(source):
+        if isinstance(child.tag, str) and local_name(child) != "rPr":
+            child.tail = None
+            target.append(child)
 
 
 def _consolidate_text(run):
-    t_elements = _get_children(run, "t")
+    t_elements = [child for child in run if _is_element(child, "t")]
 
     for i in range(len(t_elements) - 1, 0, -1):
         curr, prev = t_elements[i], t_elements[i - 1]
 
         if _is_adjacent(prev, curr):
-            prev_text = prev.firstChild.data if prev.firstChild else ""
-            curr_text = curr.firstChild.data if curr.firstChild else ""
-            merged = prev_text + curr_text
-
-            if prev.firstChild:
-                prev.firstChild.data = merged
-            else:
-                prev.appendChild(run.ownerDocument.createTextNode(merged))
+            merged = (prev.text or "") + (curr.text or "")
+            prev.text = merged
 
             if merged.startswith(" ") or merged.endswith(" "):
-                prev.setAttribute("xml:space", "preserve")
-            elif prev.hasAttribute("xml:space"):
-                prev.removeAttribute("xml:space")
+                prev.set(XML_SPACE, "preserve")
+            elif XML_SPACE in prev.attrib:
+                del prev.attrib[XML_SPACE]
 
-            run.removeChild(curr)
+            remove_element(curr)
@@ -2,7 +2,7 @@
 Command line tool to validate Office document XML files against XSD schemas and tracked changes.
 
 Usage:
-    python validate.py <path> [--original <original_file>] [--auto-repair] [--author NAME]
+    python validate.py <path> [--original <original_file>] [--auto-repair] [--author NAME] [--jobs N] [--cache] [--stream]
 
 The first argument can be either:
 - An unpacked directory containing the Office document XML files
@@ -50,6 +50,23 @@ def main():
         default="Claude",
         help="Author name for redlining validation (default: Claude)",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for per-part checks (default: 1)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse per-part results for unchanged parts via a cache file in the unpacked directory",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream large parts with iterparse instead of keeping parsed trees in memory",
+    )
     args = parser.parse_args()
 
     path = Path(args.path)
@@ -80,7 +97,14 @@ def main():
     match file_extension:
         case ".docx":
             validators = [
-                DOCXSchemaValidator(unpacked_dir, original_file, verbose=args.verbose),
+                DOCXSchemaValidator(
+                    unpacked_dir,
+                    original_file,
+                    verbose=args.verbose,
+                    jobs=args.jobs,
+                    cache=args.cache,
+                    streaming=args.stream,
+                ),
             ]
             if original_file:
                 validators.append(
@@ -88,7 +112,14 @@ def main():
                 )
         case ".pptx":
             validators = [
-                PPTXSchemaValidator(unpacked_dir, original_file, verbose=args.verbose),
+                PPTXSchemaValidator(
+                    unpacked_dir,
+                    original_file,
+                    verbose=args.verbose,
+                    jobs=args.jobs,
+                    cache=args.cache,
+                    streaming=args.stream,
+                ),
             ]
         case _:
             print(f"Error: Validation not supported for file type {file_extension}")
@@ -1,4 +1,6 @@
+from collections import defaultdict
 from dataclasses import dataclass
+import heapq
 import json
 import sys
 
@@ -12,34 +14,59 @@ class RectAndField:
     field: dict
 
 
+def rects_intersect(r1, r2):
+    disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
+    disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
+    return not (disjoint_horizontal or disjoint_vertical)
+
+
+def find_intersections(rects_and_fields: list[RectAndField]) -> list[tuple[int, int]]:
+    # Sweeps each page top to bottom, keeping only the rectangles whose
+    # vertical extent still reaches the current one, so only boxes that share
+    # a band of the page are compared. Returns index pairs (i < j) in order.
+    by_page = defaultdict(list)
+    for i, rf in enumerate(rects_and_fields):
+        by_page[rf.field["page_number"]].append(i)
+
+    pairs = []
+    for indices in by_page.values():
+        indices.sort(key=lambda i: rects_and_fields[i].rect[1])
+        active = []
+        for i in indices:
+            rect = rects_and_fields[i].rect
+            while active and active[0][0] <= rect[1]:
+                heapq.heappop(active)
+            for _, j in active:
+                if rects_intersect(rects_and_fields[j].rect, rect):
+                    pairs.append((min(i, j), max(i, j)))
+            heapq.heappush(active, (rect[3], i))
+    pairs.sort()
+    return pairs
+
+
 def get_bounding_box_messages(fields_json_stream) -> list[str]:
     messages = []
     fields = json.load(fields_json_stream)
     messages.append(f"Read {len(fields['form_fields'])} fields")
 
-    def rects_intersect(r1, r2):
-        disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
-        disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
-        return not (disjoint_horizontal or disjoint_vertical)
-
     rects_and_fields = []
     for f in fields["form_fields"]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
 
+    intersections = defaultdict(list)
+    for i, j in find_intersections(rects_and_fields):
+        intersections[i].append(j)
+
     has_error = False
     for i, ri in enumerate(rects_and_fields):
-        for j in range(i + 1, len(rects_and_fields)):
+        for j in intersections[i]:
             rj = rects_and_fields[j]
-            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
-                has_error = True
-                if ri.field is rj.field:
-                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
-                else:
-                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
-                if len(messages) >= 20:
-                    messages.append("Aborting further checks; fix bounding boxes and try again")
-                    return messages
+            has_error = True
+            if ri.field is rj.field:
+                messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
+            else:
+                messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
         if ri.rect_type == "entry":
             if "entry_text" in ri.field:
                 font_size = ri.field["entry_text"].get("font_size", 14)
@@ -47,9 +74,6 @@ def get_bounding_box_messages(fields_json_stream) -> list[str]:
                 if entry_height < font_size:
                     has_error = True
                     messages.append(f"FAILURE: entry bounding box height ({entry_height}) for `{ri.field['description']}` is too short for the text content (font size: {font_size}). Increase the box height or decrease the font size.")
-                    if len(messages) >= 20:
-                        messages.append("Aborting further checks; fix bounding boxes and try again")
-                        return messages
 
     if not has_error:
         messages.append("SUCCESS: All bounding boxes are valid")
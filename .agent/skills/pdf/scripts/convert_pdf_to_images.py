@@ -1,33 +1,109 @@
+import argparse
 import os
-import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 from pdf2image import convert_from_path
+from PIL import Image
+from pypdf import PdfReader
 
 
+MAX_DPI = 200
+PAGES_PER_RENDER = 4
 
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
+def page_dpis(pdf_path, max_dim, first_page, last_page):
+    # Render each page just large enough for its longer side to reach
+    # max_dim, instead of rendering at MAX_DPI and shrinking afterwards.
+    # pdftoppm renders the crop box, so that is what gets measured.
+    reader = PdfReader(pdf_path)
+    dpis = {}
+    for page_num in range(first_page, last_page + 1):
+        box = reader.pages[page_num - 1].cropbox
+        longest_side = max(float(box.width), float(box.height))
+        dpis[page_num] = min(MAX_DPI, max_dim * 72 / longest_side) if longest_side else MAX_DPI
+    return dpis
 
-    for i, image in enumerate(images):
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
-        image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
 
-    print(f"Converted {len(images)} pages to PNG images")
+def page_ranges(dpis, max_pages=PAGES_PER_RENDER):
+    # Consecutive pages rendered at the same DPI share one pdftoppm run, a
+    # few pages at a time, so temp files and the wait for the first saved
+    # page stay small on long documents.
+    ranges = []
+    for page_num, dpi in dpis.items():
+        if ranges:
+            first, last, range_dpi = ranges[-1]
+            if range_dpi == dpi and last == page_num - 1 and last - first + 1 < max_pages:
+                ranges[-1] = (first, page_num, dpi)
+                continue
+        ranges.append((page_num, page_num, dpi))
+    return ranges
+
+
+def convert_range(pdf_path, output_dir, first_page, last_page, dpi, max_dim):
+    converted = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # pdftoppm writes the pages to disk and they are saved as PNGs one
+        # at a time, so only one page image is held in memory per worker.
+        rendered = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            output_folder=temp_dir,
+            paths_only=True,
+        )
+        for page_num, rendered_path in zip(range(first_page, last_page + 1), rendered):
+            with Image.open(rendered_path) as image:
+                width, height = image.size
+                if width > max_dim or height > max_dim:
+                    scale_factor = min(max_dim / width, max_dim / height)
+                    new_width = int(width * scale_factor)
+                    new_height = int(height * scale_factor)
+                    image = image.resize((new_width, new_height))
+
+                image_path = os.path.join(output_dir, f"page_{page_num}.png")
+                image.save(image_path)
+                converted.append((page_num, image_path, image.size))
+    return converted
+
+
+def convert(pdf_path, output_dir, max_dim=1000, first_page=None, last_page=None, jobs=1):
+    page_count = len(PdfReader(pdf_path).pages)
+    first_page = max(1, first_page or 1)
+    last_page = min(page_count, last_page or page_count)
+    dpis = page_dpis(pdf_path, max_dim, first_page, last_page)
+
+    def render(page_range):
+        first, last, dpi = page_range
+        return convert_range(pdf_path, output_dir, first, last, dpi, max_dim)
+
+    # Each range's pages are reported as soon as it and the ranges before
+    # it are done, in page order.
+    converted = 0
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for pages in executor.map(render, page_ranges(dpis)):
+            for page_num, image_path, size in pages:
+                print(f"Saved page {page_num} as {image_path} (size: {size})")
+                converted += 1
+
+    print(f"Converted {converted} pages to PNG images")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: convert_pdf_to_images.py [input pdf] [output directory]")
-        sys.exit(1)
-    pdf_path = sys.argv[1]
-    output_directory = sys.argv[2]
-    convert(pdf_path, output_directory)
+    parser = argparse.ArgumentParser(description="Convert PDF pages to PNG images")
+    parser.add_argument("pdf_path", help="Input PDF file")
+    parser.add_argument("output_dir", help="Directory for page_N.png files")
+    parser.add_argument("--first", type=int, help="First page to convert (default: 1)")
+    parser.add_argument("--last", type=int, help="Last page to convert (default: last page)")
+    parser.add_argument(
+        "--max-dim",
+        type=int,
+        default=1000,
+        help="Maximum width or height of each image in pixels (default: 1000)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Pages to render in parallel (default: 1)"
+    )
+    args = parser.parse_args()
+    convert(args.pdf_path, args.output_dir, args.max_dim, args.first, args.last, args.jobs)
@@ -1,9 +1,19 @@
+import hashlib
 import json
+import os
 import sys
+import tempfile
+from pathlib import Path
 
 from pypdf import PdfReader
 
 
+FIELD_INDEX_VERSION = 1
+FIELD_INDEX_CACHE_DIR = Path(
+    os.environ.get("PDF_FIELD_INDEX_CACHE", Path(tempfile.gettempdir()) / "pdf_field_index")
+)
+
+
 
 
 def get_full_annotation_field_id(annotation):
@@ -107,6 +117,41 @@ def get_field_info(reader: PdfReader):
     return sorted_fields
 
 
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_field_index(pdf_path: str, reader: PdfReader = None, cache_dir: Path = None):
+    # Field info for a template is cached as JSON under the SHA-256 of the
+    # file, so filling the same blank form again skips the annotation walk.
+    cache_dir = Path(cache_dir or FIELD_INDEX_CACHE_DIR)
+    cache_path = cache_dir / f"{file_hash(pdf_path)}.json"
+
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get("version") == FIELD_INDEX_VERSION:
+            return cached["fields"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+
+    field_info = get_field_info(reader or PdfReader(pdf_path))
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=cache_dir, suffix=".tmp", delete=False) as f:
+            json.dump({"version": FIELD_INDEX_VERSION, "fields": field_info}, f)
+        os.replace(f.name, cache_path)
+    except OSError as e:
+        print(f"Warning: could not cache field index for {pdf_path}: {e}")
+
+    return json.loads(json.dumps(field_info))
+
+
 def write_field_info(pdf_path: str, json_output_path: str):
     reader = PdfReader(pdf_path)
     field_info = get_field_info(reader)
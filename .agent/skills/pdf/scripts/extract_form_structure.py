@@ -9,25 +9,49 @@ This script analyzes the PDF to find:
 Output: A JSON file with the form structure that can be used to generate
 accurate field coordinates for filling.
 
-Usage: python extract_form_structure.py <input.pdf> <output.json>
+Usage: python extract_form_structure.py <input.pdf> <output.json> [--pages 1-3,7] [--jobs N]
+
+--pages limits extraction to the listed pages; --jobs extracts runs of
+pages in parallel worker processes and merges them in page order.
 """
 
+import argparse
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import pdfplumber
 
 
-def extract_form_structure(pdf_path):
+def parse_page_ranges(spec, page_count):
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if last else start
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part}")
+        if start < 1 or end < start or end > page_count:
+            raise ValueError(f"Page range {part} is outside 1-{page_count}")
+        pages.update(range(start, end + 1))
+    return sorted(pages)
+
+
+def extract_pages(pdf_path, page_numbers):
     structure = {
         "pages": [],
         "labels": [],
         "lines": [],
         "checkboxes": [],
-        "row_boundaries": []
     }
 
     with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
+        for page_num in page_numbers:
+            page = pdf.pages[page_num - 1]
             structure["pages"].append({
                 "page_number": page_num,
                 "width": float(page.width),
@@ -68,6 +92,43 @@ def extract_form_structure(pdf_path):
                         "center_y": round((float(rect["top"]) + float(rect["bottom"])) / 2, 1)
                     })
 
+            page.close()
+
+    return structure
+
+
+def extract_form_structure(pdf_path, pages=None, jobs=1):
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+    page_numbers = list(range(1, page_count + 1)) if pages is None else pages
+
+    structure = {
+        "pages": [],
+        "labels": [],
+        "lines": [],
+        "checkboxes": [],
+        "row_boundaries": []
+    }
+
+    # Each worker reopens the PDF and extracts a contiguous run of pages;
+    # the runs are merged back in page order.
+    jobs = max(1, min(jobs, len(page_numbers)))
+    chunk_size = -(-len(page_numbers) // jobs) if page_numbers else 1
+    chunks = [
+        page_numbers[i:i + chunk_size]
+        for i in range(0, len(page_numbers), chunk_size)
+    ]
+
+    if jobs == 1:
+        results = [extract_pages(pdf_path, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(extract_pages, [pdf_path] * len(chunks), chunks))
+
+    for result in results:
+        for key, items in result.items():
+            structure[key].extend(items)
+
     lines_by_page = {}
     for line in structure["lines"]:
         page = line["page"]
@@ -89,15 +150,38 @@ def extract_form_structure(pdf_path):
 
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: extract_form_structure.py <input.pdf> <output.json>")
-        sys.exit(1)
-
-    pdf_path = sys.argv[1]
-    output_path = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="Extract form structure from a non-fillable PDF"
+    )
+    parser.add_argument("input_pdf", help="Input PDF file")
+    parser.add_argument("output_json", help="Output JSON file")
+    parser.add_argument(
+        "--pages",
+        help="Pages to extract, e.g. 1-3,7 (default: all pages)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for extracting pages in parallel (default: 1)",
+    )
+    args = parser.parse_args()
+
+    pdf_path = args.input_pdf
+    output_path = args.output_json
+
+    pages = None
+    if args.pages:
+        with pdfplumber.open(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+        try:
+            pages = parse_page_ranges(args.pages, page_count)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
     print(f"Extracting structure from {pdf_path}...")
-    structure = extract_form_structure(pdf_path)
+    structure = extract_form_structure(pdf_path, pages, args.jobs)
 
     with open(output_path, "w") as f:
         json.dump(structure, f, indent=2)
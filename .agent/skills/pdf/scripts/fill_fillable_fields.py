@@ -1,9 +1,11 @@
 import json
+import os
 import sys
+from pathlib import Path
 
 from pypdf import PdfReader, PdfWriter
 
-from extract_form_field_info import get_field_info
+from extract_form_field_info import load_field_index
 
 
 
@@ -11,36 +13,75 @@ from extract_form_field_info import get_field_info
 def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str):
     with open(fields_json_path) as f:
         fields = json.load(f)
-    fields_by_page = {}
-    for field in fields:
-        if "value" in field:
-            field_id = field["field_id"]
-            page = field["page"]
-            if page not in fields_by_page:
-                fields_by_page[page] = {}
-            fields_by_page[page][field_id] = field["value"]
-    
+
     reader = PdfReader(input_pdf_path)
+    field_info = load_field_index(input_pdf_path, reader)
+    fields_by_ids = {f["field_id"]: f for f in field_info}
+
+    errors = validation_errors(fields, fields_by_ids)
+    for err in errors:
+        print(err)
+    if errors:
+        sys.exit(1)
+
+    write_filled_pdf(reader, fields, output_pdf_path)
 
-    has_error = False
-    field_info = get_field_info(reader)
+
+def fill_pdf_fields_bulk(input_pdf_path: str, values_dir: str, output_dir: str):
+    # Parses and indexes the template once, then writes one filled copy per
+    # value set; invalid value sets are reported and skipped.
+    reader = PdfReader(input_pdf_path)
+    field_info = load_field_index(input_pdf_path, reader)
     fields_by_ids = {f["field_id"]: f for f in field_info}
+
+    os.makedirs(output_dir, exist_ok=True)
+    filled = 0
+    failed = 0
+    for fields_json_path in sorted(Path(values_dir).glob("*.json")):
+        with open(fields_json_path) as f:
+            fields = json.load(f)
+
+        errors = validation_errors(fields, fields_by_ids)
+        if errors:
+            for err in errors:
+                print(f"{fields_json_path.name}: {err}")
+            failed += 1
+            continue
+
+        output_pdf_path = os.path.join(output_dir, f"{fields_json_path.stem}.pdf")
+        write_filled_pdf(reader, fields, output_pdf_path)
+        filled += 1
+
+    print(f"Filled {filled} PDFs in {output_dir}" + (f", {failed} value sets had errors" if failed else ""))
+    if failed:
+        sys.exit(1)
+
+
+def validation_errors(fields, fields_by_ids) -> list[str]:
+    errors = []
     for field in fields:
         existing_field = fields_by_ids.get(field["field_id"])
         if not existing_field:
-            has_error = True
-            print(f"ERROR: `{field['field_id']}` is not a valid field ID")
+            errors.append(f"ERROR: `{field['field_id']}` is not a valid field ID")
         elif field["page"] != existing_field["page"]:
-            has_error = True
-            print(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
+            errors.append(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
         else:
             if "value" in field:
                 err = validation_error_for_field_value(existing_field, field["value"])
                 if err:
-                    print(err)
-                    has_error = True
-    if has_error:
-        sys.exit(1)
+                    errors.append(err)
+    return errors
+
+
+def write_filled_pdf(reader: PdfReader, fields, output_pdf_path: str):
+    fields_by_page = {}
+    for field in fields:
+        if "value" in field:
+            field_id = field["field_id"]
+            page = field["page"]
+            if page not in fields_by_page:
+                fields_by_page[page] = {}
+            fields_by_page[page][field_id] = field["value"]
 
     writer = PdfWriter(clone_from=reader)
     for page, field_values in fields_by_page.items():
@@ -88,8 +129,13 @@ def monkeypatch_pydpf_method():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--bulk":
+        monkeypatch_pydpf_method()
+        fill_pdf_fields_bulk(sys.argv[2], sys.argv[3], sys.argv[4])
+        sys.exit(0)
     if len(sys.argv) != 4:
         print("Usage: fill_fillable_fields.py [input pdf] [field_values.json] [output pdf]")
+        print("       fill_fillable_fields.py --bulk [input pdf] [field_values dir] [output dir]")
         sys.exit(1)
     monkeypatch_pydpf_method()
     input_pdf = sys.argv[1]
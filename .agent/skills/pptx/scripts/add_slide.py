@@ -1,6 +1,7 @@
 """Add a new slide to an unpacked PPTX directory.
 
 Usage: python add_slide.py <unpacked_dir> <source>
+       python add_slide.py <unpacked_dir> --batch <source> [<source> ...]
 
 The source can be:
   - A slide file (e.g., slide2.xml) - duplicates the slide
@@ -13,9 +14,16 @@ Examples:
     python add_slide.py unpacked/ slideLayout2.xml
     # Creates slide5.xml from slideLayout2.xml
 
+    python add_slide.py unpacked/ --batch slideLayout2.xml slide2.xml slide2.xml
+    # Creates slide5.xml, slide6.xml and slide7.xml and appends them,
+    # in that order, to <p:sldIdLst>
+
 To see available layouts: ls unpacked/ppt/slideLayouts/
 
-Prints the <p:sldId> element to add to presentation.xml.
+With a single source, prints the <p:sldId> element to add to
+presentation.xml. With --batch, ids for all the new slides come from one
+read of the package, and [Content_Types].xml, presentation.xml.rels and
+presentation.xml are each written once, however many slides are added.
 """
 
 import re
@@ -32,7 +40,6 @@ def get_next_slide_number(slides_dir: Path) -> int:
 
 def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
     slides_dir = unpacked_dir / "ppt" / "slides"
-    rels_dir = slides_dir / "_rels"
     layouts_dir = unpacked_dir / "ppt" / "slideLayouts"
 
     layout_path = layouts_dir / layout_file
@@ -42,6 +49,20 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 
     next_num = get_next_slide_number(slides_dir)
     dest = f"slide{next_num}.xml"
+    _write_slide_from_layout(slides_dir, dest, layout_file)
+
+    _add_to_content_types(unpacked_dir, dest)
+
+    rid = _add_to_presentation_rels(unpacked_dir, dest)
+
+    next_slide_id = _get_next_slide_id(unpacked_dir)
+
+    print(f"Created {dest} from {layout_file}")
+    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+
+
+def _write_slide_from_layout(slides_dir: Path, dest: str, layout_file: str) -> None:
+    rels_dir = slides_dir / "_rels"
     dest_slide = slides_dir / dest
     dest_rels = rels_dir / f"{dest}.rels"
 
@@ -77,19 +98,9 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 </Relationships>'''
     dest_rels.write_text(rels_xml, encoding="utf-8")
 
-    _add_to_content_types(unpacked_dir, dest)
-
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
-
-    next_slide_id = _get_next_slide_id(unpacked_dir)
-
-    print(f"Created {dest} from {layout_file}")
-    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
-
 
 def duplicate_slide(unpacked_dir: Path, source: str) -> None:
     slides_dir = unpacked_dir / "ppt" / "slides"
-    rels_dir = slides_dir / "_rels"
 
     source_slide = slides_dir / source
 
@@ -99,6 +110,21 @@ def duplicate_slide(unpacked_dir: Path, source: str) -> None:
 
     next_num = get_next_slide_number(slides_dir)
     dest = f"slide{next_num}.xml"
+    _write_duplicate_slide(slides_dir, dest, source)
+
+    _add_to_content_types(unpacked_dir, dest)
+
+    rid = _add_to_presentation_rels(unpacked_dir, dest)
+
+    next_slide_id = _get_next_slide_id(unpacked_dir)
+
+    print(f"Created {dest} from {source}")
+    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+
+
+def _write_duplicate_slide(slides_dir: Path, dest: str, source: str) -> None:
+    rels_dir = slides_dir / "_rels"
+    source_slide = slides_dir / source
     dest_slide = slides_dir / dest
 
     source_rels = rels_dir / f"{source}.rels"
@@ -117,14 +143,149 @@ def duplicate_slide(unpacked_dir: Path, source: str) -> None:
         )
         dest_rels.write_text(rels_content, encoding="utf-8")
 
-    _add_to_content_types(unpacked_dir, dest)
 
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
+class SlideIndex:
+
+    def __init__(self, unpacked_dir: Path):
+        self.unpacked_dir = unpacked_dir
+        self.slides_dir = unpacked_dir / "ppt" / "slides"
+        self.content_types_path = unpacked_dir / "[Content_Types].xml"
+        self.pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
+        self.pres_path = unpacked_dir / "ppt" / "presentation.xml"
+
+        self.content_types = self.content_types_path.read_text(encoding="utf-8")
+        self.pres_rels = self.pres_rels_path.read_text(encoding="utf-8")
+        self.presentation = self.pres_path.read_text(encoding="utf-8")
+
+        self.rel_ids = {}
+        rids = []
+        for rel in re.findall(r"<Relationship\b[^>]*>", self.pres_rels):
+            rel_id = re.search(r'\bId="([^"]+)"', rel)
+            target = re.search(r'\bTarget="([^"]+)"', rel)
+            if rel_id and target:
+                self.rel_ids[target.group(1)] = rel_id.group(1)
+            if rel_id and (m := re.fullmatch(r"rId(\d+)", rel_id.group(1))):
+                rids.append(int(m.group(1)))
+        slide_ids = [
+            int(m) for m in re.findall(r'<p:sldId[^>]*id="(\d+)"', self.presentation)
+        ]
+
+        self.next_slide_number = get_next_slide_number(self.slides_dir)
+        self.next_rid = max(rids) + 1 if rids else 1
+        self.next_slide_id = max(slide_ids) + 1 if slide_ids else 256
+        self.overrides = []
+        self.relationships = []
+        self.sld_ids = []
+
+    def allocate_slide(self) -> str:
+        dest = f"slide{self.next_slide_number}.xml"
+        self.next_slide_number += 1
+        return dest
+
+    def register(self, dest: str) -> tuple[int, str]:
+        if f"/ppt/slides/{dest}" not in self.content_types:
+            self.overrides.append(
+                f'<Override PartName="/ppt/slides/{dest}" ContentType="application/vnd.openxmlformats-officedocument.presentationml.slide+xml"/>'
+            )
+
+        target = f"slides/{dest}"
+        rid = self.rel_ids.get(target)
+        if rid is None:
+            rid = f"rId{self.next_rid}"
+            self.next_rid += 1
+            self.rel_ids[target] = rid
+            self.relationships.append(
+                f'<Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide" Target="{target}"/>'
+            )
+
+        slide_id = self.next_slide_id
+        self.next_slide_id += 1
+        self.sld_ids.append(f'<p:sldId id="{slide_id}" r:id="{rid}"/>')
+        return slide_id, rid
+
+    def write(self) -> None:
+        if self.overrides:
+            content_types = self.content_types.replace(
+                "</Types>", "".join(f"  {o}\n" for o in self.overrides) + "</Types>"
+            )
+            self.content_types_path.write_text(content_types, encoding="utf-8")
+
+        if self.relationships:
+            pres_rels = self.pres_rels.replace(
+                "</Relationships>",
+                "".join(f"  {r}\n" for r in self.relationships) + "</Relationships>",
+            )
+            self.pres_rels_path.write_text(pres_rels, encoding="utf-8")
+
+        if self.sld_ids:
+            self.pres_path.write_text(
+                _append_to_sld_id_list(self.presentation, self.sld_ids),
+                encoding="utf-8",
+            )
+
+
+def add_slides(unpacked_dir: Path, sources: list[str]) -> list[tuple[str, str, int, str]]:
+    slides_dir = unpacked_dir / "ppt" / "slides"
+    layouts_dir = unpacked_dir / "ppt" / "slideLayouts"
 
-    next_slide_id = _get_next_slide_id(unpacked_dir)
+    # Check every source before writing anything, so a bad entry leaves
+    # the directory untouched. A source may name a slide created earlier
+    # in the same batch.
+    index = SlideIndex(unpacked_dir)
+    planned = []
+    created = set()
+    for source in sources:
+        source_type, layout_file = parse_source(source)
+        if source_type == "layout" and layout_file is not None:
+            source_path = layouts_dir / layout_file
+        else:
+            source_path = slides_dir / source
+        if not source_path.exists() and source not in created:
+            print(f"Error: {source_path} not found", file=sys.stderr)
+            sys.exit(1)
+        dest = index.allocate_slide()
+        created.add(dest)
+        planned.append((source_type, source, dest))
+
+    added = []
+    for source_type, source, dest in planned:
+        if source_type == "layout":
+            _write_slide_from_layout(slides_dir, dest, source)
+        else:
+            _write_duplicate_slide(slides_dir, dest, source)
+        slide_id, rid = index.register(dest)
+        added.append((dest, source, slide_id, rid))
+
+    index.write()
+    return added
+
+
+def _append_to_sld_id_list(presentation: str, sld_ids: list[str]) -> str:
+    new_ids = "".join(f"    {sld_id}\n" for sld_id in sld_ids)
+
+    if "</p:sldIdLst>" in presentation:
+        head, tail = presentation.rsplit("</p:sldIdLst>", 1)
+        return f"{head.rstrip()}\n{new_ids}  </p:sldIdLst>{tail}"
+
+    empty = re.search(r"<p:sldIdLst\s*/>", presentation)
+    if empty:
+        return (
+            presentation[: empty.start()]
+            + f"<p:sldIdLst>\n{new_ids}  </p:sldIdLst>"
+            + presentation[empty.end() :]
+        )
 
-    print(f"Created {dest} from {source}")
-    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+    # sldIdLst follows the master id lists in <p:presentation>.
+    for preceding in (
+        "</p:handoutMasterIdLst>",
+        "</p:notesMasterIdLst>",
+        "</p:sldMasterIdLst>",
+    ):
+        if preceding in presentation:
+            head, tail = presentation.split(preceding, 1)
+            return f"{head}{preceding}\n  <p:sldIdLst>\n{new_ids}  </p:sldIdLst>{tail}"
+
+    raise ValueError("presentation.xml has no <p:sldMasterIdLst>")
 
 
 def _add_to_content_types(unpacked_dir: Path, dest: str) -> None:
@@ -170,23 +331,34 @@ def parse_source(source: str) -> tuple[str, str | None]:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
+    batch = len(sys.argv) > 3 and sys.argv[2] == "--batch"
+    if len(sys.argv) != 3 and not batch:
         print("Usage: python add_slide.py <unpacked_dir> <source>", file=sys.stderr)
+        print("       python add_slide.py <unpacked_dir> --batch <source> [<source> ...]", file=sys.stderr)
         print("", file=sys.stderr)
         print("Source can be:", file=sys.stderr)
         print("  slide2.xml        - duplicate an existing slide", file=sys.stderr)
         print("  slideLayout2.xml  - create from a layout template", file=sys.stderr)
         print("", file=sys.stderr)
+        print("--batch adds every source and appends the new slides to <p:sldIdLst>.", file=sys.stderr)
+        print("", file=sys.stderr)
         print("To see available layouts: ls <unpacked_dir>/ppt/slideLayouts/", file=sys.stderr)
         sys.exit(1)
 
     unpacked_dir = Path(sys.argv[1])
-    source = sys.argv[2]
 
     if not unpacked_dir.exists():
         print(f"Error: {unpacked_dir} not found", file=sys.stderr)
         sys.exit(1)
 
+    if batch:
+        added = add_slides(unpacked_dir, sys.argv[3:])
+        for dest, source, slide_id, rid in added:
+            print(f"Created {dest} from {source} (id={slide_id}, {rid})")
+        print(f"Appended {len(added)} slides to <p:sldIdLst>")
+        sys.exit(0)
+
+    source = sys.argv[2]
     source_type, layout_file = parse_source(source)
 
     if source_type == "layout" and layout_file is not None:
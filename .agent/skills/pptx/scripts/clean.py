@@ -1,225 +1,157 @@
 """Remove unreferenced files from an unpacked PPTX directory.
 
-Usage: python clean.py <unpacked_dir>
+Usage: python clean.py <unpacked_dir> [--dry-run]
 
 Example:
     python clean.py unpacked/
+    python clean.py unpacked/ --dry-run   # only list what would be removed
 
-This script removes:
-- Orphaned slides (not in sldIdLst) and their relationships
+Parts are marked reachable from the package relationships (_rels/.rels),
+reading each reachable part's .rels file once, and everything left
+unmarked is swept in one pass:
+- Orphaned slides (not in sldIdLst), their relationships and the
+  presentation relationships that point at them
 - [trash] directory (unreferenced files)
-- Orphaned .rels files for deleted resources
-- Unreferenced media, embeddings, charts, diagrams, drawings, ink files
-- Unreferenced theme files
-- Unreferenced notes slides
+- Unreferenced media, embeddings, charts, diagrams, drawings, ink files,
+  themes, notes slides and any other part nothing links to
+- .rels files whose source part is removed or missing
 - Content-Type overrides for deleted files
 """
 
+import argparse
+import posixpath
+import re
 import sys
 from pathlib import Path
+from urllib.parse import unquote
 
 import defusedxml.minidom
 
 
-import re
+PACKAGE_RELS = "_rels/.rels"
+CONTENT_TYPES = "[Content_Types].xml"
+PRESENTATION = "ppt/presentation.xml"
 
 
-def get_slides_in_sldidlst(unpacked_dir: Path) -> set[str]:
-    pres_path = unpacked_dir / "ppt" / "presentation.xml"
-    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
+class Relationship:
 
-    if not pres_path.exists() or not pres_rels_path.exists():
-        return set()
+    def __init__(self, rel_id: str, target: str | None):
+        self.rel_id = rel_id
+        self.target = target
 
-    rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
-    rid_to_slide = {}
-    for rel in rels_dom.getElementsByTagName("Relationship"):
-        rid = rel.getAttribute("Id")
-        target = rel.getAttribute("Target")
-        rel_type = rel.getAttribute("Type")
-        if "slide" in rel_type and target.startswith("slides/"):
-            rid_to_slide[rid] = target.replace("slides/", "")
 
-    pres_content = pres_path.read_text(encoding="utf-8")
-    referenced_rids = set(re.findall(r'<p:sldId[^>]*r:id="([^"]+)"', pres_content))
+class PackageGraph:
 
-    return {rid_to_slide[rid] for rid in referenced_rids if rid in rid_to_slide}
+    def __init__(self, unpacked_dir: Path):
+        self.unpacked_dir = unpacked_dir
+        self.files = {
+            path.relative_to(unpacked_dir).as_posix()
+            for path in unpacked_dir.rglob("*")
+            if path.is_file()
+        }
+        self._relationships = {}
 
+    def relationships(self, part: str) -> list[Relationship]:
+        # Parsed on first use, so .rels files of unreachable parts are never read.
+        if part not in self._relationships:
+            name = rels_path(part)
+            self._relationships[part] = (
+                parse_relationships(self.unpacked_dir / name, part)
+                if name in self.files
+                else []
+            )
+        return self._relationships[part]
 
-def remove_orphaned_slides(unpacked_dir: Path) -> list[str]:
-    slides_dir = unpacked_dir / "ppt" / "slides"
-    slides_rels_dir = slides_dir / "_rels"
-    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
+    def reachable(self, excluded: set[str]) -> set[str]:
+        marked = set()
+        stack = [""]
+        while stack:
+            part = stack.pop()
+            for rel in self.relationships(part):
+                target = rel.target
+                if target is None or target in marked or target in excluded:
+                    continue
+                marked.add(target)
+                stack.append(target)
+        return marked
 
-    if not slides_dir.exists():
-        return []
 
-    referenced_slides = get_slides_in_sldidlst(unpacked_dir)
-    removed = []
+def rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
 
-    for slide_file in slides_dir.glob("slide*.xml"):
-        if slide_file.name not in referenced_slides:
-            rel_path = slide_file.relative_to(unpacked_dir)
-            slide_file.unlink()
-            removed.append(str(rel_path))
 
-            rels_file = slides_rels_dir / f"{slide_file.name}.rels"
-            if rels_file.exists():
-                rels_file.unlink()
-                removed.append(str(rels_file.relative_to(unpacked_dir)))
+def source_part(name: str) -> str | None:
+    directory, file_name = posixpath.split(name)
+    if posixpath.basename(directory) != "_rels" or not file_name.endswith(".rels"):
+        return None
+    return posixpath.join(posixpath.dirname(directory), file_name[: -len(".rels")])
 
-    if removed and pres_rels_path.exists():
-        rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
-        changed = False
 
-        for rel in list(rels_dom.getElementsByTagName("Relationship")):
-            target = rel.getAttribute("Target")
-            if target.startswith("slides/"):
-                slide_name = target.replace("slides/", "")
-                if slide_name not in referenced_slides:
-                    if rel.parentNode:
-                        rel.parentNode.removeChild(rel)
-                        changed = True
+def parse_relationships(path: Path, source: str) -> list[Relationship]:
+    dom = defusedxml.minidom.parse(str(path))
+    base = posixpath.dirname(source)
+    relationships = []
+    for rel in dom.getElementsByTagName("Relationship"):
+        target = rel.getAttribute("Target")
+        if not target or rel.getAttribute("TargetMode") == "External":
+            target = None
+        else:
+            target = unquote(target.split("#", 1)[0])
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(base, target))
+            if not target or target.startswith("../") or target in (".", ".."):
+                target = None
+        relationships.append(
+            Relationship(rel.getAttribute("Id"), target)
+        )
+    return relationships
+
+
+def get_orphaned_slides(unpacked_dir: Path, graph: PackageGraph) -> set[str]:
+    pres_path = unpacked_dir / PRESENTATION
+    if not pres_path.exists() or rels_path(PRESENTATION) not in graph.files:
+        return set()
 
-        if changed:
-            with open(pres_rels_path, "wb") as f:
-                f.write(rels_dom.toxml(encoding="utf-8"))
+    pres_content = pres_path.read_text(encoding="utf-8")
+    referenced_rids = set(re.findall(r'<p:sldId[^>]*r:id="([^"]+)"', pres_content))
 
-    return removed
+    listed = {
+        rel.target
+        for rel in graph.relationships(PRESENTATION)
+        if rel.rel_id in referenced_rids
+    }
+    orphaned = set()
+    slides_dir = unpacked_dir / "ppt" / "slides"
+    if slides_dir.exists():
+        for slide_file in slides_dir.glob("slide*.xml"):
+            name = slide_file.relative_to(unpacked_dir).as_posix()
+            if name not in listed:
+                orphaned.add(name)
 
+    return orphaned
 
-def remove_trash_directory(unpacked_dir: Path) -> list[str]:
-    trash_dir = unpacked_dir / "[trash]"
-    removed = []
-
-    if trash_dir.exists() and trash_dir.is_dir():
-        for file_path in trash_dir.iterdir():
-            if file_path.is_file():
-                rel_path = file_path.relative_to(unpacked_dir)
-                removed.append(str(rel_path))
-                file_path.unlink()
-        trash_dir.rmdir()
 
-    return removed
-
-
-def get_slide_referenced_files(unpacked_dir: Path) -> set:
-    referenced = set()
-    slides_rels_dir = unpacked_dir / "ppt" / "slides" / "_rels"
-
-    if not slides_rels_dir.exists():
-        return referenced
-
-    for rels_file in slides_rels_dir.glob("*.rels"):
-        dom = defusedxml.minidom.parse(str(rels_file))
-        for rel in dom.getElementsByTagName("Relationship"):
-            target = rel.getAttribute("Target")
-            if not target:
-                continue
-            target_path = (rels_file.parent.parent / target).resolve()
-            try:
-                referenced.add(target_path.relative_to(unpacked_dir.resolve()))
-            except ValueError:
-                pass
-
-    return referenced
-
-
-def remove_orphaned_rels_files(unpacked_dir: Path) -> list[str]:
-    resource_dirs = ["charts", "diagrams", "drawings"]
-    removed = []
-    slide_referenced = get_slide_referenced_files(unpacked_dir)
-
-    for dir_name in resource_dirs:
-        rels_dir = unpacked_dir / "ppt" / dir_name / "_rels"
-        if not rels_dir.exists():
-            continue
-
-        for rels_file in rels_dir.glob("*.rels"):
-            resource_file = rels_dir.parent / rels_file.name.replace(".rels", "")
-            try:
-                resource_rel_path = resource_file.resolve().relative_to(unpacked_dir.resolve())
-            except ValueError:
-                continue
-
-            if not resource_file.exists() or resource_rel_path not in slide_referenced:
-                rels_file.unlink()
-                rel_path = rels_file.relative_to(unpacked_dir)
-                removed.append(str(rel_path))
-
-    return removed
-
-
-def get_referenced_files(unpacked_dir: Path) -> set:
-    referenced = set()
-
-    for rels_file in unpacked_dir.rglob("*.rels"):
-        dom = defusedxml.minidom.parse(str(rels_file))
-        for rel in dom.getElementsByTagName("Relationship"):
-            target = rel.getAttribute("Target")
-            if not target:
-                continue
-            target_path = (rels_file.parent.parent / target).resolve()
-            try:
-                referenced.add(target_path.relative_to(unpacked_dir.resolve()))
-            except ValueError:
-                pass
-
-    return referenced
-
-
-def remove_orphaned_files(unpacked_dir: Path, referenced: set) -> list[str]:
-    resource_dirs = ["media", "embeddings", "charts", "diagrams", "tags", "drawings", "ink"]
-    removed = []
-
-    for dir_name in resource_dirs:
-        dir_path = unpacked_dir / "ppt" / dir_name
-        if not dir_path.exists():
-            continue
-
-        for file_path in dir_path.glob("*"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-
-    theme_dir = unpacked_dir / "ppt" / "theme"
-    if theme_dir.exists():
-        for file_path in theme_dir.glob("theme*.xml"):
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-                theme_rels = theme_dir / "_rels" / f"{file_path.name}.rels"
-                if theme_rels.exists():
-                    theme_rels.unlink()
-                    removed.append(str(theme_rels.relative_to(unpacked_dir)))
-
-    notes_dir = unpacked_dir / "ppt" / "notesSlides"
-    if notes_dir.exists():
-        for file_path in notes_dir.glob("*.xml"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-
-        notes_rels_dir = notes_dir / "_rels"
-        if notes_rels_dir.exists():
-            for file_path in notes_rels_dir.glob("*.rels"):
-                notes_file = notes_dir / file_path.name.replace(".rels", "")
-                if not notes_file.exists():
-                    file_path.unlink()
-                    removed.append(str(file_path.relative_to(unpacked_dir)))
-
-    return removed
-
-
-def update_content_types(unpacked_dir: Path, removed_files: list[str]) -> None:
-    ct_path = unpacked_dir / "[Content_Types].xml"
+def remove_presentation_rels(unpacked_dir: Path, slides: set[str]) -> None:
+    pres_rels_path = unpacked_dir / rels_path(PRESENTATION)
+    rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
+    changed = False
+
+    for rel in list(rels_dom.getElementsByTagName("Relationship")):
+        target = rel.getAttribute("Target")
+        if target.startswith("slides/") and f"ppt/{target}" in slides:
+            rel.parentNode.removeChild(rel)
+            changed = True
+
+    if changed:
+        with open(pres_rels_path, "wb") as f:
+            f.write(rels_dom.toxml(encoding="utf-8"))
+
+
+def update_content_types(unpacked_dir: Path, removed_files: set[str]) -> None:
+    ct_path = unpacked_dir / CONTENT_TYPES
     if not ct_path.exists():
         return
 
@@ -238,48 +170,78 @@ def update_content_types(unpacked_dir: Path, removed_files: list[str]) -> None:
             f.write(dom.toxml(encoding="utf-8"))
 
 
-def clean_unused_files(unpacked_dir: Path) -> list[str]:
-    all_removed = []
+def find_unused_files(unpacked_dir: Path) -> tuple[list[str], set[str]]:
+    graph = PackageGraph(unpacked_dir)
+    orphaned_slides = get_orphaned_slides(unpacked_dir, graph)
 
-    slides_removed = remove_orphaned_slides(unpacked_dir)
-    all_removed.extend(slides_removed)
+    if PACKAGE_RELS not in graph.files:
+        unused = {name for name in graph.files if name.startswith("[trash]/")}
+    else:
+        keep = graph.reachable(excluded=orphaned_slides)
+        keep.add(CONTENT_TYPES)
+        keep.update(rels_path(part) for part in list(keep) if rels_path(part) in graph.files)
+        keep.add(PACKAGE_RELS)
+        unused = graph.files - keep
 
-    trash_removed = remove_trash_directory(unpacked_dir)
-    all_removed.extend(trash_removed)
+    unused.update(name for name in orphaned_slides if name in graph.files)
+    unused.update(
+        rels_path(name) for name in orphaned_slides if rels_path(name) in graph.files
+    )
 
-    while True:
-        removed_rels = remove_orphaned_rels_files(unpacked_dir)
-        referenced = get_referenced_files(unpacked_dir)
-        removed_files = remove_orphaned_files(unpacked_dir, referenced)
+    def order(name):
+        if name in orphaned_slides or source_part(name) in orphaned_slides:
+            return (0, name)
+        if name.startswith("[trash]/"):
+            return (1, name)
+        return (2, name)
 
-        total_removed = removed_rels + removed_files
-        if not total_removed:
-            break
+    return sorted(unused, key=order), orphaned_slides
 
-        all_removed.extend(total_removed)
 
-    if all_removed:
-        update_content_types(unpacked_dir, all_removed)
+def clean_unused_files(unpacked_dir: Path, dry_run: bool = False) -> list[str]:
+    unused, orphaned_slides = find_unused_files(unpacked_dir)
 
-    return all_removed
+    if dry_run or not unused:
+        return unused
 
+    for name in unused:
+        (unpacked_dir / name).unlink()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python clean.py <unpacked_dir>", file=sys.stderr)
-        print("Example: python clean.py unpacked/", file=sys.stderr)
-        sys.exit(1)
+    trash_dir = unpacked_dir / "[trash]"
+    if trash_dir.is_dir() and not any(trash_dir.iterdir()):
+        trash_dir.rmdir()
+
+    if orphaned_slides and (unpacked_dir / rels_path(PRESENTATION)).exists():
+        remove_presentation_rels(unpacked_dir, orphaned_slides)
 
-    unpacked_dir = Path(sys.argv[1])
+    update_content_types(unpacked_dir, set(unused))
+
+    return unused
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Remove unreferenced files from an unpacked PPTX directory"
+    )
+    parser.add_argument("unpacked_dir", help="Unpacked PPTX directory")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the files that would be removed without changing anything",
+    )
+    args = parser.parse_args()
+
+    unpacked_dir = Path(args.unpacked_dir)
 
     if not unpacked_dir.exists():
         print(f"Error: {unpacked_dir} not found", file=sys.stderr)
         sys.exit(1)
 
-    removed = clean_unused_files(unpacked_dir)
+    removed = clean_unused_files(unpacked_dir, args.dry_run)
 
     if removed:
-        print(f"Removed {len(removed)} unreferenced files:")
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"{verb} {len(removed)} unreferenced files:")
         for f in removed:
             print(f"  {f}")
     else:
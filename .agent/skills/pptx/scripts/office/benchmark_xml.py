@@ -0,0 +1,91 @@
+"""Compare the lxml and minidom XML formatters on an Office file.
+
+Runs the pack (condense) and unpack (pretty-print) formatting of every XML
+part through both implementations, checks that the output is byte-identical,
+and reports the time each one took.
+
+Usage:
+    python benchmark_xml.py <office_file> [--repeat N]
+
+Examples:
+    python benchmark_xml.py large.docx
+    python benchmark_xml.py deck.pptx --repeat 10
+"""
+
+import argparse
+import sys
+import time
+import zipfile
+
+from helpers.package import is_xml_part
+from helpers.xml_format import (
+    _minidom_condense,
+    _minidom_pretty_print,
+    condense_xml,
+    pretty_print_xml,
+)
+
+OPERATIONS = {
+    "pretty-print": (_minidom_pretty_print, pretty_print_xml),
+    "condense": (_minidom_condense, condense_xml),
+}
+
+
+def benchmark(office_file: str, repeat: int = 3) -> tuple[bool, str]:
+    with zipfile.ZipFile(office_file) as zf:
+        parts = {
+            name: zf.read(name) for name in zf.namelist() if is_xml_part(name)
+        }
+
+    total_bytes = sum(len(content) for content in parts.values())
+    lines = [f"{office_file}: {len(parts)} XML parts, {total_bytes / 1e6:.2f} MB"]
+    identical = True
+
+    for operation, (baseline, fast) in OPERATIONS.items():
+        inputs = parts
+        if operation == "condense":
+            inputs = {name: pretty_print_xml(content) for name, content in parts.items()}
+
+        for name, content in inputs.items():
+            if baseline(content) != fast(content):
+                lines.append(f"  MISMATCH {operation}: {name}")
+                identical = False
+
+        baseline_time = _time(baseline, inputs.values(), repeat)
+        fast_time = _time(fast, inputs.values(), repeat)
+        lines.append(
+            f"  {operation}: minidom {baseline_time * 1000:.1f} ms, "
+            f"lxml {fast_time * 1000:.1f} ms ({baseline_time / fast_time:.1f}x)"
+        )
+
+    return identical, "\n".join(lines)
+
+
+def _time(func, contents, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark lxml against minidom XML formatting"
+    )
+    parser.add_argument("office_file", help="DOCX, PPTX, or XLSX file to benchmark")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timing runs per implementation; the best is reported (default: 3)",
+    )
+    args = parser.parse_args()
+
+    identical, report = benchmark(args.office_file, max(1, args.repeat))
+    print(report)
+
+    if not identical:
+        sys.exit(1)
@@ -0,0 +1,159 @@
+"""Move Office package parts between a ZIP archive and a directory in one pass.
+
+Parts are addressed by their ZIP member name. XML parts (.xml/.rels) are
+read into memory and passed through an optional transform before being
+written out; every other part is streamed straight through. Used by
+pack.py and unpack.py so neither needs a temporary copy of the package.
+
+When writing, already-compressed media (images, audio, video, embedded
+packages) is stored as-is. Every other part is read, transformed and
+deflated on a thread pool (zlib releases the GIL), a bounded number of
+parts ahead of the writer, which appends the finished entries in input
+order. zipfile has no public call for adding pre-compressed data, so that
+append relies on ZipFile internals and is limited to the CPython versions
+it was checked against (PRECOMPRESSED_WRITES); elsewhere the pool only
+reads and transforms, and ZipFile.writestr() deflates each part.
+"""
+
+import os
+import sys
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+
+XML_PART_SUFFIXES = (".xml", ".rels")
+
+PRECOMPRESSED_WRITES = (3, 8) <= sys.version_info[:2] <= (3, 13) and hasattr(
+    zipfile.ZipFile, "_writecheck"
+)
+
+STORED_PART_SUFFIXES = (
+    ".jpg", ".jpeg", ".png", ".gif", ".webp",
+    ".mp3", ".m4a", ".wma",
+    ".mp4", ".m4v", ".mov", ".wmv", ".avi",
+    ".zip", ".docx", ".xlsx", ".pptx",
+)
+
+
+def is_xml_part(name: str) -> bool:
+    return name.lower().endswith(XML_PART_SUFFIXES)
+
+
+def is_stored_part(name: str) -> bool:
+    return name.lower().endswith(STORED_PART_SUFFIXES)
+
+
+def iter_directory_parts(input_dir: Path, exclude=frozenset()):
+    input_dir = Path(input_dir)
+    for path in input_dir.rglob("*"):
+        if path.is_file() and path.name not in exclude:
+            yield path.relative_to(input_dir).as_posix(), path
+
+
+def write_zip(
+    output_path: Path,
+    parts,
+    transform=None,
+    compress_level: int | None = None,
+    workers: int | None = None,
+) -> int:
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    count = 0
+    try:
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf, \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for name, path in parts:
+                if is_stored_part(name):
+                    job = None
+                else:
+                    job = pool.submit(
+                        _read_part, path, name, transform, compress_level
+                    )
+                pending.append((name, path, job))
+                if len(pending) >= 2 * workers:
+                    _write_part(zf, *pending.popleft(), compress_level)
+                count += 1
+            while pending:
+                _write_part(zf, *pending.popleft(), compress_level)
+    except Exception:
+        Path(output_path).unlink(missing_ok=True)
+        raise
+    return count
+
+
+def _read_part(path: Path, name: str, transform, compress_level):
+    data = path.read_bytes()
+    if transform is not None and is_xml_part(name):
+        data = transform(data, name)
+    if not PRECOMPRESSED_WRITES:
+        return data
+
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if compress_level is None else compress_level,
+        zlib.DEFLATED,
+        -15,
+    )
+    return len(data), zlib.crc32(data), compressor.compress(data) + compressor.flush()
+
+
+def _write_part(zf: zipfile.ZipFile, name: str, path: Path, job, compress_level) -> None:
+    if job is None:
+        zf.write(path, name, compress_type=zipfile.ZIP_STORED)
+        return
+
+    info = zipfile.ZipInfo.from_file(path, name)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    if not PRECOMPRESSED_WRITES:
+        zf.writestr(info, job.result(), compresslevel=compress_level)
+        return
+
+    size, crc, compressed = job.result()
+    info.file_size = size
+    info.compress_size = len(compressed)
+    info.CRC = crc
+
+    # Writes what ZipFile.writestr() leaves behind for a deflated entry on a
+    # seekable file, except that the sizes are known up front, so the local
+    # header is written once and zip64 is used only when they need it.
+    with zf._lock:
+        if zf._writing:
+            raise ValueError("Can't write to ZIP archive while an open writing handle exists")
+        zf.fp.seek(zf.start_dir)
+        info.header_offset = zf.fp.tell()
+        zf._writecheck(info)
+        zf._didModify = True
+        zf.fp.write(info.FileHeader(None))
+        zf.fp.write(compressed)
+        zf.filelist.append(info)
+        zf.NameToInfo[info.filename] = info
+        zf.start_dir = zf.fp.tell()
+
+
+def extract_zip(input_path: Path, output_dir: Path, transform=None) -> list[Path]:
+    output_dir = Path(output_dir)
+    xml_files = []
+
+    with zipfile.ZipFile(input_path, "r") as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not is_xml_part(info.filename) or transform is None:
+                extracted = Path(zf.extract(info, output_dir))
+                if not info.is_dir() and is_xml_part(info.filename):
+                    xml_files.append(extracted)
+                continue
+
+            target = output_dir / _safe_member_path(info.filename)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(transform(zf.read(info), info.filename))
+            xml_files.append(target)
+
+    return xml_files
+
+
+def _safe_member_path(name: str) -> PurePosixPath:
+    path = PurePosixPath(name.replace("\\", "/"))
+    if path.is_absolute() or ".." in path.parts:
+        raise ValueError(f"Unsafe path in archive: {name}")
+    return path
@@ -12,12 +12,34 @@ Usage:
     # Option 2 – get env dict for your own subprocess calls
     env = get_soffice_env()
     subprocess.run(["soffice", ...], env=env)
+
+    # Option 3 – keep headless soffice processes running and send them jobs
+    with SofficePool(size=2) as pool:
+        futures = [pool.submit(SofficeWorker.convert, p, p.with_suffix(".pdf"), "writer_pdf_Export")
+                   for p in inputs]
+        for future in futures:
+            future.result()
+
+Pool workers are started through get_soffice_env(), so the shim applies to
+them too, and are driven over a loopback TCP UNO connection (AF_INET, which
+the shim leaves alone). Each worker has its own profile directory. Before a
+job runs the worker is health-checked and restarted if it died; a job that
+hangs past job_timeout kills its worker, which is then restarted and the job
+retried. The client needs LibreOffice's Python bindings (the `uno` module);
+worker_available() reports whether they and soffice can be found, so callers
+can fall back to one soffice process per document.
 """
 
+import importlib.util
 import os
+import queue
+import shutil
 import socket
 import subprocess
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -37,6 +59,230 @@ def run_soffice(args: list[str], **kwargs) -> subprocess.CompletedProcess:
     return subprocess.run(["soffice"] + args, env=env, **kwargs)
 
 
+def worker_available() -> bool:
+    if shutil.which("soffice") is None:
+        return False
+    return importlib.util.find_spec("uno") is not None
+
+
+class SofficeWorker:
+
+    HOST = "127.0.0.1"
+
+    def __init__(self, startup_timeout: float = 60):
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.profile_dir = None
+        self.port = None
+        self._context = None
+        self._desktop = None
+
+    def start(self) -> None:
+        import uno
+        from com.sun.star.connection import NoConnectException
+
+        self.profile_dir = tempfile.mkdtemp(prefix="soffice_worker_")
+        self.port = _free_port()
+        self.process = subprocess.Popen(
+            [
+                "soffice",
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                f"-env:UserInstallation={Path(self.profile_dir).as_uri()}",
+                f"--accept=socket,host={self.HOST},port={self.port};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=get_soffice_env(),
+        )
+
+        # Any failure from here on, not just a refused connection, must not
+        # leave the process or its profile directory behind.
+        try:
+            local = uno.getComponentContext()
+            resolver = local.ServiceManager.createInstanceWithContext(
+                "com.sun.star.bridge.UnoUrlResolver", local
+            )
+            deadline = time.monotonic() + self.startup_timeout
+            while True:
+                try:
+                    self._context = resolver.resolve(
+                        f"uno:socket,host={self.HOST},port={self.port};urp;StarOffice.ComponentContext"
+                    )
+                    break
+                except NoConnectException:
+                    if self.process.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("LibreOffice worker failed to start")
+                    time.sleep(0.25)
+
+            self._desktop = self._create("com.sun.star.frame.Desktop")
+        except BaseException:
+            self.kill()
+            self.stop()
+            raise
+
+    def stop(self) -> None:
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+        self._desktop = None
+        self._context = None
+
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.kill()
+            self.process = None
+
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def kill(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def restart(self) -> None:
+        self.kill()
+        self.stop()
+        self.start()
+
+    def is_healthy(self) -> bool:
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            self._desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def open(self, path, hidden: bool = True):
+        import uno
+
+        return self._desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(Path(path).absolute())),
+            "_blank",
+            0,
+            (_property("Hidden", hidden),),
+        )
+
+    def process_document(self, path, action, store: bool = True):
+        document = self.open(path)
+        try:
+            result = action(self, document)
+            if store:
+                document.store()
+            return result
+        finally:
+            document.close(True)
+
+    def convert(self, input_path, output_path, filter_name: str) -> Path:
+        import uno
+
+        output_path = Path(output_path).absolute()
+        document = self.open(input_path)
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(str(output_path)),
+                (_property("FilterName", filter_name),),
+            )
+        finally:
+            document.close(True)
+        return output_path
+
+    def dispatch(self, document, command: str) -> None:
+        dispatcher = self._create("com.sun.star.frame.DispatchHelper")
+        frame = document.getCurrentController().getFrame()
+        dispatcher.executeDispatch(frame, command, "", 0, ())
+
+    def _create(self, service: str):
+        return self._context.ServiceManager.createInstanceWithContext(
+            service, self._context
+        )
+
+
+class SofficePool:
+
+    def __init__(self, size: int = 1, job_timeout: float = 120, retries: int = 1):
+        self.size = max(1, size)
+        self.job_timeout = job_timeout
+        self.retries = retries
+        self._workers = []
+        self._idle = queue.Queue()
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self) -> None:
+        self._workers = [SofficeWorker() for _ in range(self.size)]
+        try:
+            with ThreadPoolExecutor(max_workers=self.size) as starter:
+                list(starter.map(SofficeWorker.start, self._workers))
+        except Exception:
+            # Stop the workers that did come up before reporting the failure.
+            self.close()
+            raise
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._executor = ThreadPoolExecutor(max_workers=self.size)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+        self._idle = queue.Queue()
+
+    def submit(self, job, *args, **kwargs):
+        return self._executor.submit(self._run, job, args, kwargs)
+
+    def _run(self, job, args, kwargs):
+        worker = self._idle.get()
+        try:
+            for attempt in range(self.retries + 1):
+                if not worker.is_healthy():
+                    worker.restart()
+                watchdog = threading.Timer(self.job_timeout, worker.kill)
+                watchdog.start()
+                try:
+                    return job(worker, *args, **kwargs)
+                except Exception:
+                    if attempt == self.retries or worker.is_healthy():
+                        raise
+                finally:
+                    watchdog.cancel()
+        finally:
+            self._idle.put(worker)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((SofficeWorker.HOST, 0))
+        return s.getsockname()[1]
+
+
+def _property(name: str, value):
+    from com.sun.star.beans import PropertyValue
+
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
 
 _SHIM_SO = Path(tempfile.gettempdir()) / "lo_socket_shim.so"
 
@@ -4,6 +4,8 @@ Extracts the ZIP archive, pretty-prints XML files, and optionally:
 - Merges adjacent runs with identical formatting (DOCX only)
 - Simplifies adjacent tracked changes from same author (DOCX only)
 
+Both DOCX steps apply to the body, headers, footers, footnotes and endnotes.
+
 Usage:
     python unpack.py <office_file> <output_dir> [options]
 
@@ -18,10 +20,9 @@ import sys
 import zipfile
 from pathlib import Path
 
-import defusedxml.minidom
-
-from helpers.merge_runs import merge_runs as do_merge_runs
-from helpers.simplify_redlines import simplify_redlines as do_simplify_redlines
+from helpers.normalize import is_story_part, normalize_part
+from helpers.package import extract_zip
+from helpers.xml_format import pretty_print_xml
 
 SMART_QUOTE_REPLACEMENTS = {
     "\u201c": "&#x201C;",  
@@ -50,26 +51,34 @@ def unpack(
     try:
         output_path.mkdir(parents=True, exist_ok=True)
 
-        with zipfile.ZipFile(input_path, "r") as zf:
-            zf.extractall(output_path)
-
-        xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-        for xml_file in xml_files:
-            _pretty_print_xml(xml_file)
+        normalizes_stories = suffix == ".docx" and (simplify_redlines or merge_runs)
+        counts = {"simplified": 0, "merged": 0}
+
+        def process_part(content: bytes, name: str) -> bytes:
+            content = _pretty_print_xml(content)
+            if normalizes_stories and is_story_part(name):
+                try:
+                    content, simplified, merged = normalize_part(
+                        content,
+                        merge_runs=merge_runs,
+                        simplify_redlines=simplify_redlines,
+                    )
+                    counts["simplified"] += simplified
+                    counts["merged"] += merged
+                except Exception:
+                    pass
+            return _escape_smart_quotes(content)
+
+        xml_files = extract_zip(input_path, output_path, transform=process_part)
 
         message = f"Unpacked {input_file} ({len(xml_files)} XML files)"
 
-        if suffix == ".docx":
+        if normalizes_stories:
             if simplify_redlines:
-                simplify_count, _ = do_simplify_redlines(str(output_path))
-                message += f", simplified {simplify_count} tracked changes"
+                message += f", simplified {counts['simplified']} tracked changes"
 
             if merge_runs:
-                merge_count, _ = do_merge_runs(str(output_path))
-                message += f", merged {merge_count} runs"
-
-        for xml_file in xml_files:
-            _escape_smart_quotes(xml_file)
+                message += f", merged {counts['merged']} runs"
 
         return None, message
 
@@ -79,23 +88,21 @@ def unpack(
         return None, f"Error unpacking: {e}"
 
 
-def _pretty_print_xml(xml_file: Path) -> None:
+def _pretty_print_xml(content: bytes) -> bytes:
     try:
-        content = xml_file.read_text(encoding="utf-8")
-        dom = defusedxml.minidom.parseString(content)
-        xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="utf-8"))
+        return pretty_print_xml(content)
     except Exception:
-        pass  
+        return content
 
 
-def _escape_smart_quotes(xml_file: Path) -> None:
+def _escape_smart_quotes(content: bytes) -> bytes:
     try:
-        content = xml_file.read_text(encoding="utf-8")
+        text = content.decode("utf-8")
         for char, entity in SMART_QUOTE_REPLACEMENTS.items():
-            content = content.replace(char, entity)
-        xml_file.write_text(content, encoding="utf-8")
+            text = text.replace(char, entity)
+        return text.encode("utf-8")
     except Exception:
-        pass
+        return content
 
 
 if __name__ == "__main__":
@@ -2,12 +2,130 @@
 Base validator with common validation logic for document files.
 """
 
+import hashlib
+import json
 import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import defusedxml.minidom
 import lxml.etree
 
+from helpers.xml_format import XML_NAMESPACE, UnsupportedXml, XmlPart, qualified_name
+
+from .rules import (
+    Rule,
+    file_events,
+    iter_file_elements,
+    local_name,
+    tree_events,
+    walk_rules,
+)
+
+
+_SCHEMA_CACHE = {}
+
+VALIDATION_CACHE_NAME = ".validation_cache.json"
+VALIDATION_CACHE_VERSION = 2
+
+
+class OriginalPackage:
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._zip = None
+        self._names = None
+
+    def read(self, relative_path):
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.path, "r")
+            self._names = set(self._zip.namelist())
+
+        name = str(relative_path).replace("\\", "/")
+        if name not in self._names:
+            return None
+        return self._zip.read(name)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+            self._names = None
+
+
+class UniqueIdsRule(Rule):
+
+    name = "unique_ids"
+
+    def __init__(self, validator, xml_file):
+        super().__init__(validator, xml_file)
+        self.entries = []
+        self.file_ids = {}
+        self.mc_alternate_content = f"{{{validator.MC_NAMESPACE}}}AlternateContent"
+
+    def visit(self, elem, context):
+        validator = self.validator
+        tag = local_name(elem.tag).lower()
+
+        if tag not in validator.UNIQUE_ID_REQUIREMENTS:
+            return
+        if context.inside(self.mc_alternate_content):
+            return
+        if context.inside_any_local(validator.EXCLUDED_ID_CONTAINERS):
+            return
+
+        attr_name, scope = validator.UNIQUE_ID_REQUIREMENTS[tag]
+
+        id_value = None
+        for attr, value in elem.attrib.items():
+            if local_name(attr).lower() == attr_name:
+                id_value = value
+                break
+
+        if id_value is None:
+            return
+
+        if scope == "global":
+            self.entries.append(("global", id_value, elem.sourceline, tag))
+        elif scope == "file":
+            ids = self.file_ids.setdefault((tag, attr_name), {})
+            if id_value in ids:
+                self.entries.append((
+                    "error",
+                    f"  {self.xml_file.relative_to(validator.unpacked_dir)}: "
+                    f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
+                    f"(first occurrence at line {ids[id_value]})",
+                ))
+            else:
+                ids[id_value] = elem.sourceline
+
+    def on_error(self, error):
+        self.entries.append((
+            "error",
+            f"  {self.xml_file.relative_to(self.validator.unpacked_dir)}: Error: {error}",
+        ))
+
+    def result(self):
+        return self.entries
+
+
+_WORKER_VALIDATOR = None
+
+
+def _init_part_worker(validator_cls, unpacked_dir, original_file, streaming):
+    global _WORKER_VALIDATOR
+    _WORKER_VALIDATOR = validator_cls(
+        unpacked_dir, original_file, streaming=streaming
+    )
+
+
+def _run_part_checks(xml_file):
+    try:
+        return _WORKER_VALIDATOR.run_part_checks(xml_file)
+    finally:
+        _WORKER_VALIDATOR._invalidate(xml_file)
+
 
 class BaseSchemaValidator:
 
@@ -40,6 +158,10 @@ class BaseSchemaValidator:
 
     ELEMENT_RELATIONSHIP_TYPES = {}
 
+    PART_CHECKS = ("xsd", "rules")
+
+    RULES = (UniqueIdsRule,)
+
     SCHEMA_MAPPINGS = {
         "word": "ISO-IEC29500-4_2016/wml.xsd",  
         "ppt": "ISO-IEC29500-4_2016/pml.xsd",  
@@ -91,10 +213,29 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file=None, verbose=False):
+    def __init__(
+        self,
+        unpacked_dir,
+        original_file=None,
+        verbose=False,
+        jobs=1,
+        cache=False,
+        streaming=False,
+    ):
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file) if original_file else None
         self.verbose = verbose
+        self.jobs = max(1, jobs or 1)
+        self.cache = cache
+        self.streaming = streaming
+
+        self.original_package = (
+            OriginalPackage(self.original_file) if self.original_file else None
+        )
+        self._original_errors = {}
+        self._trees = {}
+        self._part_results = {}
+        self._part_hashes = {}
 
         self.schemas_dir = Path(__file__).parent.parent / "schemas"
 
@@ -106,6 +247,157 @@ class BaseSchemaValidator:
         if not self.xml_files:
             print(f"Warning: No XML files found in {self.unpacked_dir}")
 
+    def _parse(self, xml_file):
+        xml_file = Path(xml_file)
+        tree = self._trees.get(xml_file)
+        if tree is None:
+            tree = lxml.etree.parse(str(xml_file))
+            if not self.streaming:
+                self._trees[xml_file] = tree
+        return tree
+
+    def _parse_root(self, xml_file):
+        if not self.streaming:
+            return self._parse(xml_file).getroot()
+
+        # Only the opening tag is needed, so stop after the first event and
+        # close the file now rather than when the parser is collected.
+        with open(xml_file, "rb") as f:
+            events = lxml.etree.iterparse(f, events=("start",))
+            try:
+                _, root = next(events, (None, None))
+            finally:
+                del events
+        return root
+
+    def _iter_elements(self, xml_file):
+        if self.streaming:
+            return iter_file_elements(xml_file)
+        return self._parse(xml_file).iter()
+
+    def _invalidate(self, xml_file):
+        self._trees.pop(Path(xml_file), None)
+        self._part_results.pop(Path(xml_file), None)
+
+    def run_part_checks(self, xml_file):
+        return {
+            name: getattr(self, f"_check_{name}")(xml_file)
+            for name in self.PART_CHECKS
+        }
+
+    def prefetch_part_checks(self):
+        if self.cache:
+            self.load_part_cache()
+
+        pending = [f for f in self.xml_files if f not in self._part_results]
+        if self.jobs <= 1 or len(pending) < 2:
+            return
+
+        chunksize = max(1, len(pending) // (self.jobs * 4))
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_part_worker,
+            initargs=(
+                type(self),
+                self.unpacked_dir,
+                self.original_file,
+                self.streaming,
+            ),
+        ) as executor:
+            results = executor.map(_run_part_checks, pending, chunksize=chunksize)
+            self._part_results.update(zip(pending, results))
+
+    def _cache_header(self):
+        original = None
+        if self.original_file is not None and self.original_file.exists():
+            stat = self.original_file.stat()
+            original = f"{self.original_file.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+        return {
+            "version": VALIDATION_CACHE_VERSION,
+            "validator": type(self).__name__,
+            "original": original,
+        }
+
+    def load_part_cache(self):
+        for xml_file in self.xml_files:
+            self._part_hashes[xml_file] = hashlib.sha256(
+                xml_file.read_bytes()
+            ).hexdigest()
+
+        cache_file = self.unpacked_dir / VALIDATION_CACHE_NAME
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0
+
+        if cached.get("header") != self._cache_header():
+            return 0
+
+        reused = 0
+        parts = cached.get("parts", {})
+        for xml_file in self.xml_files:
+            entry = parts.get(xml_file.relative_to(self.unpacked_dir).as_posix())
+            if not entry or entry.get("hash") != self._part_hashes[xml_file]:
+                continue
+            if not all(name in entry["results"] for name in self.PART_CHECKS):
+                continue
+            self._part_results[xml_file] = entry["results"]
+            reused += 1
+
+        if self.verbose:
+            print(f"Reused cached results for {reused}/{len(self.xml_files)} parts")
+        return reused
+
+    def save_part_cache(self):
+        if not self.cache:
+            return
+
+        parts = {}
+        for xml_file in self.xml_files:
+            results = self._part_results.get(xml_file, {})
+            part_hash = self._part_hashes.get(xml_file)
+            if part_hash is None or not all(name in results for name in self.PART_CHECKS):
+                continue
+            parts[xml_file.relative_to(self.unpacked_dir).as_posix()] = {
+                "hash": part_hash,
+                "results": {name: results[name] for name in self.PART_CHECKS},
+            }
+
+        cache_file = self.unpacked_dir / VALIDATION_CACHE_NAME
+        try:
+            cache_file.write_text(
+                json.dumps({"header": self._cache_header(), "parts": parts}, default=sorted),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            print(f"Warning: Could not write validation cache: {e}")
+
+    def _part_check(self, name, xml_file):
+        results = self._part_results.setdefault(Path(xml_file), {})
+        if name not in results:
+            results[name] = getattr(self, f"_check_{name}")(xml_file)
+        return results[name]
+
+    def _check_rules(self, xml_file):
+        rules = [
+            rule_cls(self, xml_file)
+            for rule_cls in self.RULES
+            if rule_cls.applies_to(xml_file)
+        ]
+
+        try:
+            if self.streaming:
+                return walk_rules(file_events(xml_file), rules, clear=True)
+            return walk_rules(tree_events(self._parse(xml_file)), rules)
+        except Exception as e:
+            for rule in rules:
+                rule.on_error(e)
+            return {rule.name: rule.result() for rule in rules}
+
+    def _rule_result(self, name, xml_file):
+        return self._part_check("rules", xml_file).get(name, [])
+
     def validate(self):
         raise NotImplementedError("Subclasses must implement the validate method")
 
@@ -117,35 +409,69 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                content = xml_file.read_text(encoding="utf-8")
-                dom = defusedxml.minidom.parseString(content)
-                modified = False
-
-                for elem in dom.getElementsByTagName("*"):
-                    if elem.tagName.endswith(":t") and elem.firstChild:
-                        text = elem.firstChild.nodeValue
-                        if text and (text.startswith((' ', '\t')) or text.endswith((' ', '\t'))):
-                            if elem.getAttribute("xml:space") != "preserve":
-                                elem.setAttribute("xml:space", "preserve")
-                                text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
-                                print(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {elem.tagName}: {text_preview}")
-                                repairs += 1
-                                modified = True
-
-                if modified:
-                    xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+                content = xml_file.read_bytes()
+                try:
+                    part = XmlPart(content)
+                except UnsupportedXml:
+                    file_repairs, repaired = self._repair_whitespace_minidom(xml_file, content)
+                else:
+                    file_repairs = self._repair_whitespace_elements(
+                        xml_file, part.root.iter("{*}t")
+                    )
+                    repaired = part.tobytes() if file_repairs else None
+
+                if file_repairs:
+                    xml_file.write_bytes(repaired)
+                    self._invalidate(xml_file)
+                    repairs += file_repairs
 
             except Exception:
                 pass
 
         return repairs
 
+    def _repair_whitespace_elements(self, xml_file, elements) -> int:
+        repairs = 0
+        space_attr = f"{{{XML_NAMESPACE}}}space"
+
+        for elem in elements:
+            name = qualified_name(elem)
+            text = elem.text
+            if name.endswith(":t") and text and (text.startswith((' ', '\t')) or text.endswith((' ', '\t'))):
+                if elem.get(space_attr) != "preserve":
+                    elem.set(space_attr, "preserve")
+                    text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
+                    print(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {name}: {text_preview}")
+                    repairs += 1
+
+        return repairs
+
+    def _repair_whitespace_minidom(self, xml_file, content):
+        dom = defusedxml.minidom.parseString(content.decode("utf-8"))
+        repairs = 0
+
+        for elem in dom.getElementsByTagName("*"):
+            if elem.tagName.endswith(":t") and elem.firstChild:
+                text = elem.firstChild.nodeValue
+                if text and (text.startswith((' ', '\t')) or text.endswith((' ', '\t'))):
+                    if elem.getAttribute("xml:space") != "preserve":
+                        elem.setAttribute("xml:space", "preserve")
+                        text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
+                        print(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {elem.tagName}: {text_preview}")
+                        repairs += 1
+
+        return repairs, dom.toxml(encoding="UTF-8")
+
     def validate_xml(self):
         errors = []
 
         for xml_file in self.xml_files:
             try:
-                lxml.etree.parse(str(xml_file))
+                if self.streaming:
+                    for _ in iter_file_elements(xml_file):
+                        pass
+                else:
+                    self._parse(xml_file)
             except lxml.etree.XMLSyntaxError as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: "
@@ -172,7 +498,7 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self._parse_root(xml_file)
                 declared = set(root.nsmap.keys()) - {None}  
 
                 for attr_val in [
@@ -201,80 +527,25 @@ class BaseSchemaValidator:
         global_ids = {}  
 
         for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                file_ids = {}  
+            for entry in self._rule_result("unique_ids", xml_file):
+                if entry[0] != "global":
+                    errors.append(entry[1])
+                    continue
 
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
-
-                for elem in root.iter():
-                    tag = (
-                        elem.tag.split("}")[-1].lower()
-                        if "}" in elem.tag
-                        else elem.tag.lower()
+                _, id_value, line, tag = entry
+                if id_value in global_ids:
+                    prev_file, prev_line, prev_tag = global_ids[id_value]
+                    errors.append(
+                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                        f"Line {line}: Global ID '{id_value}' in <{tag}> "
+                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
+                    )
+                else:
+                    global_ids[id_value] = (
+                        xml_file.relative_to(self.unpacked_dir),
+                        line,
+                        tag,
                     )
-
-                    if tag in self.UNIQUE_ID_REQUIREMENTS:
-                        in_excluded_container = any(
-                            ancestor.tag.split("}")[-1].lower() in self.EXCLUDED_ID_CONTAINERS
-                            for ancestor in elem.iterancestors()
-                        )
-                        if in_excluded_container:
-                            continue
-
-                        attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[tag]
-
-                        id_value = None
-                        for attr, value in elem.attrib.items():
-                            attr_local = (
-                                attr.split("}")[-1].lower()
-                                if "}" in attr
-                                else attr.lower()
-                            )
-                            if attr_local == attr_name:
-                                id_value = value
-                                break
-
-                        if id_value is not None:
-                            if scope == "global":
-                                if id_value in global_ids:
-                                    prev_file, prev_line, prev_tag = global_ids[
-                                        id_value
-                                    ]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Global ID '{id_value}' in <{tag}> "
-                                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
-                                    )
-                                else:
-                                    global_ids[id_value] = (
-                                        xml_file.relative_to(self.unpacked_dir),
-                                        elem.sourceline,
-                                        tag,
-                                    )
-                            elif scope == "file":
-                                key = (tag, attr_name)
-                                if key not in file_ids:
-                                    file_ids[key] = {}
-
-                                if id_value in file_ids[key]:
-                                    prev_line = file_ids[key][id_value]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
-                                        f"(first occurrence at line {prev_line})"
-                                    )
-                                else:
-                                    file_ids[key][id_value] = elem.sourceline
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
 
         if errors:
             print(f"FAILED - Found {len(errors)} ID uniqueness violations:")
@@ -301,6 +572,7 @@ class BaseSchemaValidator:
             if (
                 file_path.is_file()
                 and file_path.name != "[Content_Types].xml"
+                and file_path.name != VALIDATION_CACHE_NAME
                 and not file_path.name.endswith(".rels")
             ):  
                 all_files.append(file_path.resolve())
@@ -314,7 +586,7 @@ class BaseSchemaValidator:
 
         for rels_file in rels_files:
             try:
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self._parse(rels_file).getroot()
 
                 rels_dir = rels_file.parent
 
@@ -383,8 +655,6 @@ class BaseSchemaValidator:
             return True
 
     def validate_all_relationship_ids(self):
-        import lxml.etree
-
         errors = []
 
         for xml_file in self.xml_files:
@@ -398,7 +668,7 @@ class BaseSchemaValidator:
                 continue
 
             try:
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self._parse(rels_file).getroot()
                 rid_to_type = {}
 
                 for rel in rels_root.findall(
@@ -418,11 +688,9 @@ class BaseSchemaValidator:
                         )
                         rid_to_type[rid] = type_name
 
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
-
                 r_ns = self.OFFICE_RELATIONSHIPS_NAMESPACE
                 rid_attrs_to_check = ["id", "embed", "link"]
-                for elem in xml_root.iter():
+                for elem in self._iter_elements(xml_file):
                     for attr_name in rid_attrs_to_check:
                         rid_attr = elem.get(f"{{{r_ns}}}{attr_name}")
                         if not rid_attr:
@@ -498,7 +766,7 @@ class BaseSchemaValidator:
             return False
 
         try:
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self._parse(content_types_file).getroot()
             declared_parts = set()
             declared_extensions = set()
 
@@ -553,7 +821,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
+                    root_tag = self._parse_root(xml_file).tag
                     root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
 
                     if root_name in declarable_roots and path_str not in declared_parts:
@@ -567,7 +835,7 @@ class BaseSchemaValidator:
             for file_path in all_files:
                 if file_path.suffix.lower() in {".xml", ".rels"}:
                     continue
-                if file_path.name == "[Content_Types].xml":
+                if file_path.name in ("[Content_Types].xml", VALIDATION_CACHE_NAME):
                     continue
                 if "_rels" in file_path.parts or "docProps" in file_path.parts:
                     continue
@@ -641,9 +909,7 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
+            is_valid, new_file_errors = self._part_check("xsd", xml_file)
 
             if is_valid is None:
                 skipped_count += 1
@@ -657,7 +923,7 @@ class BaseSchemaValidator:
                 continue
 
             new_errors.append(f"  {relative_path}: {len(new_file_errors)} new error(s)")
-            for error in list(new_file_errors)[:3]:  
+            for error in sorted(new_file_errors)[:3]:  
                 new_errors.append(
                     f"    - {error[:250]}..." if len(error) > 250 else f"    - {error}"
                 )
@@ -682,6 +948,9 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _check_xsd(self, xml_file):
+        return self.validate_file_against_xsd(xml_file, verbose=False)
+
     def _get_schema_path(self, xml_file):
         if xml_file.name in self.SCHEMA_MAPPINGS:
             return self.schemas_dir / self.SCHEMA_MAPPINGS[xml_file.name]
@@ -753,20 +1022,20 @@ class BaseSchemaValidator:
             return None, None  
 
         try:
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            return self._validate_xml_doc_xsd(
+                self._parse(xml_file), schema_path, xml_file.relative_to(base_path)
+            )
 
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
+        except Exception as e:
+            return False, {str(e)}
+
+    def _validate_xml_doc_xsd(self, xml_doc, schema_path, relative_path):
+        try:
+            schema = self._get_schema(schema_path)
 
             xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
             xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
 
-            relative_path = xml_file.relative_to(base_path)
             if (
                 relative_path.parts
                 and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
@@ -784,32 +1053,57 @@ class BaseSchemaValidator:
         except Exception as e:
             return False, {str(e)}
 
+    def _get_schema(self, schema_path):
+        schema_path = Path(schema_path).resolve()
+        key = (str(schema_path), schema_path.stat().st_mtime_ns)
+
+        schema = _SCHEMA_CACHE.get(key)
+        if schema is None:
+            with open(schema_path, "rb") as xsd_file:
+                parser = lxml.etree.XMLParser()
+                xsd_doc = lxml.etree.parse(
+                    xsd_file, parser=parser, base_url=str(schema_path)
+                )
+                schema = lxml.etree.XMLSchema(xsd_doc)
+            _SCHEMA_CACHE[key] = schema
+
+        return schema
+
     def _get_original_file_errors(self, xml_file):
-        if self.original_file is None:
+        if self.original_package is None:
             return set()
 
-        import tempfile
-        import zipfile
-
         xml_file = Path(xml_file).resolve()
-        unpacked_dir = self.unpacked_dir.resolve()
-        relative_path = xml_file.relative_to(unpacked_dir)
+        relative_path = xml_file.relative_to(self.unpacked_dir.resolve())
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+        key = relative_path.as_posix()
+        if key not in self._original_errors:
+            self._original_errors[key] = self._validate_original_part_xsd(
+                relative_path
+            )
+        return self._original_errors[key]
 
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
+    def _validate_original_part_xsd(self, relative_path):
+        schema_path = self._get_schema_path(self.unpacked_dir / relative_path)
+        if not schema_path:
+            return set()
 
-            original_xml_file = temp_path / relative_path
+        try:
+            content = self.original_package.read(relative_path.as_posix())
+        except (OSError, zipfile.BadZipFile) as e:
+            return {str(e)}
+        if content is None:
+            return set()
 
-            if not original_xml_file.exists():
-                return set()
+        try:
+            xml_doc = lxml.etree.ElementTree(lxml.etree.fromstring(content))
+        except Exception as e:
+            return {str(e)}
 
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
-            )
-            return errors if errors else set()
+        is_valid, errors = self._validate_xml_doc_xsd(
+            xml_doc, schema_path, relative_path
+        )
+        return errors if errors else set()
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         warnings = []
@@ -0,0 +1,140 @@
+"""
+Single-pass rule engine for per-part validation checks.
+
+Rules register the tags they care about; walk_rules() streams over a part
+once and dispatches each element to the matching rules, tracking open
+ancestors on counters instead of scanning ancestors per element. Rules that
+read element text visit on the "end" event; the rest visit on "start".
+
+The events can come from an already parsed tree (tree_events) or straight
+from the file (file_events), in which case finished elements are cleared so
+memory stays bounded regardless of part size.
+"""
+
+import lxml.etree
+
+
+class WalkContext:
+
+    def __init__(self):
+        self.open_tags = {}
+        self.open_local_names = {}
+
+    def inside(self, tag):
+        return self.open_tags.get(tag, 0) > 0
+
+    def inside_local(self, local_name):
+        return self.open_local_names.get(local_name, 0) > 0
+
+    def inside_any_local(self, local_names):
+        return any(self.open_local_names.get(name, 0) > 0 for name in local_names)
+
+    def _push(self, tag, local_name):
+        self.open_tags[tag] = self.open_tags.get(tag, 0) + 1
+        self.open_local_names[local_name] = self.open_local_names.get(local_name, 0) + 1
+
+    def _pop(self, tag, local_name):
+        self.open_tags[tag] -= 1
+        self.open_local_names[local_name] -= 1
+
+
+class Rule:
+
+    name = None
+    tags = None
+    event = "start"
+
+    def __init__(self, validator, xml_file):
+        self.validator = validator
+        self.xml_file = xml_file
+        self.errors = []
+
+    @classmethod
+    def applies_to(cls, xml_file):
+        return True
+
+    def visit(self, elem, context):
+        raise NotImplementedError("Rules must implement the visit method")
+
+    def on_error(self, error):
+        self.errors.append(
+            f"  {self.xml_file.relative_to(self.validator.unpacked_dir)}: Error: {error}"
+        )
+
+    def result(self):
+        return self.errors
+
+
+def local_name(tag):
+    return tag.split("}")[-1] if "}" in tag else tag
+
+
+def tree_events(tree):
+    return lxml.etree.iterwalk(tree, events=("start", "end"))
+
+
+def file_events(xml_file):
+    return lxml.etree.iterparse(str(xml_file), events=("start", "end"))
+
+
+def clear_element(elem):
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def iter_file_elements(xml_file):
+    for event, elem in file_events(xml_file):
+        if event == "start":
+            yield elem
+        else:
+            clear_element(elem)
+
+
+def walk_rules(events, rules, clear=False):
+    by_event_tag = {"start": {}, "end": {}}
+    wildcard = {"start": [], "end": []}
+    for rule in rules:
+        if rule.tags is None:
+            wildcard[rule.event].append(rule)
+        else:
+            for tag in rule.tags:
+                by_event_tag[rule.event].setdefault(tag, []).append(rule)
+
+    dispatch = {"start": {}, "end": {}}
+    names = {}
+    failed = set()
+    context = WalkContext()
+
+    for event, elem in events:
+        tag = elem.tag
+        name = names.get(tag)
+        if name is None:
+            name = names[tag] = local_name(tag).lower()
+
+        if event == "end":
+            context._pop(tag, name)
+
+        matched = dispatch[event].get(tag)
+        if matched is None:
+            matched = dispatch[event][tag] = (
+                wildcard[event] + by_event_tag[event].get(tag, [])
+            )
+
+        for rule in matched:
+            if rule in failed:
+                continue
+            try:
+                rule.visit(elem, context)
+            except Exception as e:
+                failed.add(rule)
+                rule.on_error(e)
+
+        if event == "start":
+            context._push(tag, name)
+        elif clear:
+            clear_element(elem)
+
+    return {rule.name: rule.result() for rule in rules}
@@ -2,10 +2,13 @@
 
 Creates a grid layout of slide thumbnails for quick visual analysis.
 Labels each thumbnail with its XML filename (e.g., slide1.xml).
-Hidden slides are shown with a placeholder pattern.
+Hidden slides are shown with a placeholder pattern. Rendered slides are
+cached by content (see thumbnail_cache.py), so after an edit only the
+changed slides go through LibreOffice again.
 
 Usage:
-    python thumbnail.py input.pptx [output_prefix] [--cols N]
+    python thumbnail.py input.pptx [output_prefix] [--cols N] [--no-cache]
+                        [--format jpg|webp|png] [--jobs N]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -13,24 +16,41 @@ Examples:
 
     python thumbnail.py template.pptx grid --cols 4
     # Creates: grid.jpg (or grid-1.jpg, grid-2.jpg for large decks)
+
+    python thumbnail.py template.pptx grid --format webp
+    # Creates: grid.webp
 """
 
 import argparse
+import math
+import os
+import re
 import subprocess
 import sys
 import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import defusedxml.minidom
-from office.soffice import get_soffice_env
+from office.soffice import SofficeWorker, get_soffice_env
 from PIL import Image, ImageDraw, ImageFont
+from thumbnail_cache import ThumbnailCache, slide_keys, write_partial_deck
 
 THUMBNAIL_WIDTH = 300
 CONVERSION_DPI = 100
+OVERSAMPLE = 2
+EMU_PER_INCH = 914400
+PAGES_PER_RENDERER = 8
 MAX_COLS = 6
 DEFAULT_COLS = 3
 JPEG_QUALITY = 95
+OUTPUT_FORMATS = {
+    "jpg": ("JPEG", {"quality": JPEG_QUALITY}),
+    "webp": ("WEBP", {"quality": JPEG_QUALITY}),
+    "png": ("PNG", {}),
+}
+DEFAULT_FORMAT = "jpg"
 GRID_PADDING = 20
 BORDER_WIDTH = 2
 FONT_SIZE_RATIO = 0.10
@@ -54,6 +74,22 @@ def main():
         default=DEFAULT_COLS,
         help=f"Number of columns (default: {DEFAULT_COLS}, max: {MAX_COLS})",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every slide instead of reusing cached slide images",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default=DEFAULT_FORMAT,
+        help=f"Grid image format (default: {DEFAULT_FORMAT})",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Threads for rendering pages and building grids (default: CPU count)",
+    )
 
     args = parser.parse_args()
 
@@ -66,14 +102,27 @@ def main():
         print(f"Error: Invalid PowerPoint file: {args.input}", file=sys.stderr)
         sys.exit(1)
 
-    output_path = Path(f"{args.output_prefix}.jpg")
+    output_path = Path(f"{args.output_prefix}.{args.format}")
 
     try:
         slide_info = get_slide_info(input_path)
+        dpi = conversion_dpi(get_slide_width(input_path), THUMBNAIL_WIDTH)
 
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
-            visible_images = convert_to_images(input_path, temp_path)
+            if args.no_cache:
+                visible_images = convert_to_images(
+                    input_path, temp_path, dpi=dpi, jobs=args.jobs
+                )
+            else:
+                visible_images = render_with_cache(
+                    input_path,
+                    temp_path,
+                    slide_info,
+                    dpi,
+                    ThumbnailCache(),
+                    jobs=args.jobs,
+                )
 
             if not visible_images and not any(s["hidden"] for s in slide_info):
                 print("Error: No slides found", file=sys.stderr)
@@ -81,7 +130,9 @@ def main():
 
             slides = build_slide_list(slide_info, visible_images, temp_path)
 
-            grid_files = create_grids(slides, cols, THUMBNAIL_WIDTH, output_path)
+            grid_files = create_grids(
+                slides, cols, THUMBNAIL_WIDTH, output_path, args.format, args.jobs
+            )
 
             print(f"Created {len(grid_files)} grid(s):")
             for grid_file in grid_files:
@@ -113,11 +164,34 @@ def get_slide_info(pptx_path: Path) -> list[dict]:
             rid = sld_id.getAttribute("r:id")
             if rid in rid_to_slide:
                 hidden = sld_id.getAttribute("show") == "0"
-                slides.append({"name": rid_to_slide[rid], "hidden": hidden})
+                slides.append(
+                    {"name": rid_to_slide[rid], "rid": rid, "hidden": hidden}
+                )
 
         return slides
 
 
+def get_slide_width(pptx_path: Path) -> int | None:
+    with zipfile.ZipFile(pptx_path, "r") as zf:
+        pres_dom = defusedxml.minidom.parseString(zf.read("ppt/presentation.xml"))
+    for sld_sz in pres_dom.getElementsByTagName("p:sldSz"):
+        try:
+            return int(sld_sz.getAttribute("cx"))
+        except ValueError:
+            return None
+    return None
+
+
+def conversion_dpi(slide_width_emu: int | None, thumbnail_width: int) -> int:
+    # Render at OVERSAMPLE x the thumbnail width so the LANCZOS downscale has
+    # detail to work with, but no larger; never above CONVERSION_DPI.
+    if not slide_width_emu:
+        return CONVERSION_DPI
+    slide_width_in = slide_width_emu / EMU_PER_INCH
+    dpi = math.ceil(thumbnail_width * OVERSAMPLE / slide_width_in)
+    return max(1, min(CONVERSION_DPI, dpi))
+
+
 def build_slide_list(
     slide_info: list[dict],
     visible_images: list[Path],
@@ -131,12 +205,16 @@ def build_slide_list(
 
     slides = []
     visible_idx = 0
+    placeholder_path = None
 
     for info in slide_info:
         if info["hidden"]:
-            placeholder_path = temp_dir / f"hidden-{info['name']}.jpg"
-            placeholder_img = create_hidden_placeholder(placeholder_size)
-            placeholder_img.save(placeholder_path, "JPEG")
+            # Every hidden slide shares one placeholder image.
+            if placeholder_path is None:
+                placeholder_path = temp_dir / "hidden.jpg"
+                create_hidden_placeholder(placeholder_size).save(
+                    placeholder_path, "JPEG"
+                )
             slides.append((placeholder_path, f"{info['name']} (hidden)"))
         else:
             if visible_idx < len(visible_images):
@@ -155,84 +233,212 @@ def create_hidden_placeholder(size: tuple[int, int]) -> Image.Image:
     return img
 
 
-def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Path]:
+def render_with_cache(
+    pptx_path: Path,
+    temp_dir: Path,
+    slide_info: list[dict],
+    dpi: int,
+    cache: ThumbnailCache,
+    jobs: int | None = None,
+) -> list[Path]:
+    keys = slide_keys(pptx_path, [s["name"] for s in slide_info], f"dpi={dpi}")
+    visible = [s for s in slide_info if not s["hidden"]]
+    images = {s["name"]: cache.get(keys[s["name"]]) for s in visible}
+    stale = [s for s in visible if images[s["name"]] is None]
+
+    if stale:
+        if len(stale) == len(visible):
+            deck = pptx_path
+        else:
+            # Render only the changed slides, from a copy of the deck in
+            # which every other slide is hidden.
+            deck = temp_dir / f"changed-{pptx_path.name}"
+            stale_rids = {s["rid"] for s in stale}
+            write_partial_deck(
+                pptx_path,
+                deck,
+                {s["rid"] for s in slide_info if s["rid"] not in stale_rids},
+            )
+
+        rendered = convert_to_images(deck, temp_dir, dpi=dpi, jobs=jobs)
+        if len(rendered) != len(stale):
+            if deck == pptx_path:
+                return rendered
+            raise RuntimeError(
+                f"Expected {len(stale)} rendered slides, got {len(rendered)}"
+            )
+        for info, image_path in zip(stale, rendered):
+            images[info["name"]] = cache.put(keys[info["name"]], image_path)
+
+    cache.prune()
+    return [images[s["name"]] for s in visible]
+
+
+def convert_to_images(
+    pptx_path: Path,
+    temp_dir: Path,
+    pool=None,
+    dpi: int = CONVERSION_DPI,
+    jobs: int | None = None,
+) -> list[Path]:
     pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
 
-    result = subprocess.run(
-        [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            str(temp_dir),
-            str(pptx_path),
-        ],
-        capture_output=True,
-        text=True,
-        env=get_soffice_env(),
-    )
-    if result.returncode != 0 or not pdf_path.exists():
+    if pool is not None:
+        try:
+            pool.submit(
+                SofficeWorker.convert, pptx_path, pdf_path, "impress_pdf_Export"
+            ).result()
+        except Exception as e:
+            raise RuntimeError(f"PDF conversion failed: {e}") from e
+    else:
+        result = subprocess.run(
+            [
+                "soffice",
+                "--headless",
+                "--convert-to",
+                "pdf",
+                "--outdir",
+                str(temp_dir),
+                str(pptx_path),
+            ],
+            capture_output=True,
+            text=True,
+            env=get_soffice_env(),
+        )
+        if result.returncode != 0:
+            raise RuntimeError("PDF conversion failed")
+    if not pdf_path.exists():
         raise RuntimeError("PDF conversion failed")
 
-    result = subprocess.run(
-        [
-            "pdftoppm",
-            "-jpeg",
-            "-r",
-            str(CONVERSION_DPI),
-            str(pdf_path),
-            str(temp_dir / "slide"),
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
+    # Pages are rendered in ranges of PAGES_PER_RENDERER, split over the
+    # pages the PDF really has, which can be fewer than the visible slides;
+    # a range starting past the end would make pdftoppm fail. If the count
+    # cannot be read, one open-ended range covers all pages. Each range is
+    # written under its own prefix; zero-padded prefixes keep the combined
+    # listing in page order.
+    page_count = pdf_page_count(pdf_path)
+    if page_count:
+        ranges = [
+            (first, min(first + PAGES_PER_RENDERER - 1, page_count))
+            for first in range(1, page_count + 1, PAGES_PER_RENDERER)
+        ]
+    else:
+        ranges = [(1, None)]
+    ranges = [
+        (first, last, temp_dir / f"slide-{idx:04d}")
+        for idx, (first, last) in enumerate(ranges)
+    ]
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(ranges)))
+
+    def render(page_range):
+        first, last, prefix = page_range
+        cmd = ["pdftoppm", "-jpeg", "-r", str(dpi), "-f", str(first)]
+        if last is not None:
+            cmd += ["-l", str(last)]
+        return subprocess.run(
+            cmd + [str(pdf_path), str(prefix)], capture_output=True, text=True
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(render, ranges))
+    if any(result.returncode != 0 for result in results):
         raise RuntimeError("Image conversion failed")
 
     return sorted(temp_dir.glob("slide-*.jpg"))
 
 
+def pdf_page_count(pdf_path: Path) -> int | None:
+    try:
+        result = subprocess.run(
+            ["pdfinfo", str(pdf_path)], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    match = re.search(r"^Pages:\s+(\d+)", result.stdout, re.MULTILINE)
+    return int(match.group(1)) if match else None
+
+
 def create_grids(
     slides: list[tuple[Path, str]],
     cols: int,
     width: int,
     output_path: Path,
+    image_format: str = DEFAULT_FORMAT,
+    jobs: int = None,
 ) -> list[str]:
     max_per_grid = cols * (cols + 1)
+    chunks = [
+        slides[start_idx : start_idx + max_per_grid]
+        for start_idx in range(0, len(slides), max_per_grid)
+    ]
+    save_format, save_options = OUTPUT_FORMATS[image_format]
     grid_files = []
 
-    for chunk_idx, start_idx in enumerate(range(0, len(slides), max_per_grid)):
-        end_idx = min(start_idx + max_per_grid, len(slides))
-        chunk_slides = slides[start_idx:end_idx]
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        # The next chunk's tiles are decoded while the current grid is
+        # composed and written, so at most two grids of tiles are in memory.
+        pending = load_tiles(executor, chunks[0], width) if chunks else None
+        for chunk_idx, chunk_slides in enumerate(chunks):
+            tiles = pending
+            if chunk_idx + 1 < len(chunks):
+                pending = load_tiles(executor, chunks[chunk_idx + 1], width)
 
-        grid = create_grid(chunk_slides, cols, width)
+            grid = create_grid(chunk_slides, tiles, cols, width)
 
-        if len(slides) <= max_per_grid:
-            grid_filename = output_path
-        else:
-            stem = output_path.stem
-            suffix = output_path.suffix
-            grid_filename = output_path.parent / f"{stem}-{chunk_idx + 1}{suffix}"
+            if len(chunks) == 1:
+                grid_filename = output_path
+            else:
+                stem = output_path.stem
+                suffix = output_path.suffix
+                grid_filename = output_path.parent / f"{stem}-{chunk_idx + 1}{suffix}"
 
-        grid_filename.parent.mkdir(parents=True, exist_ok=True)
-        grid.save(str(grid_filename), quality=JPEG_QUALITY)
-        grid_files.append(str(grid_filename))
+            grid_filename.parent.mkdir(parents=True, exist_ok=True)
+            grid.save(str(grid_filename), save_format, **save_options)
+            grid_files.append(str(grid_filename))
 
     return grid_files
 
 
+def load_tiles(
+    executor: ThreadPoolExecutor,
+    slides: list[tuple[Path, str]],
+    width: int,
+) -> dict:
+    size = (width, tile_height(slides[0][0], width))
+
+    # Each distinct image is decoded once, however many slides show it.
+    return {
+        img_path: executor.submit(load_tile, img_path, size)
+        for img_path in dict.fromkeys(img_path for img_path, _ in slides)
+    }
+
+
+def tile_height(img_path: Path, width: int) -> int:
+    with Image.open(img_path) as img:
+        aspect = img.height / img.width
+    return int(width * aspect)
+
+
+def load_tile(img_path: Path, size: tuple[int, int]) -> Image.Image:
+    with Image.open(img_path) as img:
+        # For JPEGs, draft() makes the decoder scale down by 1/2, 1/4 or
+        # 1/8 while decoding, as far as it can without going below the
+        # thumbnail size.
+        img.draft("RGB", size)
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        return img.copy()
+
+
 def create_grid(
     slides: list[tuple[Path, str]],
+    tiles: dict,
     cols: int,
     width: int,
 ) -> Image.Image:
     font_size = int(width * FONT_SIZE_RATIO)
     label_padding = int(font_size * LABEL_PADDING_RATIO)
 
-    with Image.open(slides[0][0]) as img:
-        aspect = img.height / img.width
-    height = int(width * aspect)
+    height = tile_height(slides[0][0], width)
 
     rows = (len(slides) + cols - 1) // cols
     grid_w = cols * width + (cols + 1) * GRID_PADDING
@@ -265,22 +471,21 @@ def create_grid(
 
         y_thumbnail = y_base + label_padding + font_size + label_padding
 
-        with Image.open(img_path) as img:
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
-            w, h = img.size
-            tx = x + (width - w) // 2
-            ty = y_thumbnail + (height - h) // 2
-            grid.paste(img, (tx, ty))
-
-            if BORDER_WIDTH > 0:
-                draw.rectangle(
-                    [
-                        (tx - BORDER_WIDTH, ty - BORDER_WIDTH),
-                        (tx + w + BORDER_WIDTH - 1, ty + h + BORDER_WIDTH - 1),
-                    ],
-                    outline="gray",
-                    width=BORDER_WIDTH,
-                )
+        img = tiles[img_path].result()
+        w, h = img.size
+        tx = x + (width - w) // 2
+        ty = y_thumbnail + (height - h) // 2
+        grid.paste(img, (tx, ty))
+
+        if BORDER_WIDTH > 0:
+            draw.rectangle(
+                [
+                    (tx - BORDER_WIDTH, ty - BORDER_WIDTH),
+                    (tx + w + BORDER_WIDTH - 1, ty + h + BORDER_WIDTH - 1),
+                ],
+                outline="gray",
+                width=BORDER_WIDTH,
+            )
 
     return grid
 
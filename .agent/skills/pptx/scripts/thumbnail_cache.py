@@ -0,0 +1,191 @@
+"""Cache rendered slide images across thumbnail.py runs.
+
+Each slide is keyed by a hash of everything that affects how it renders:
+its own XML plus the closure of parts it pulls in through relationships
+(layout, master, theme, images, charts, embedded objects), the slide size
+and default text styles from presentation.xml, the presentation-level
+parts (table styles, embedded fonts, presProps), and the render settings.
+Slides whose XML shows a slide-number field also key on their position.
+Links that do not change the rendered slide (other slides, notes, comments,
+a master's list of layouts) are not followed, so editing one slide
+invalidates only that slide's tile.
+
+Cached images live in $PPTX_THUMBNAIL_CACHE, or pptx_thumbnail_cache under
+the temp dir by default. The least recently used entries are dropped once
+there are more than MAX_ENTRIES.
+"""
+
+import hashlib
+import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+import defusedxml.minidom
+
+CACHE_VERSION = 1
+MAX_ENTRIES = 5000
+CACHE_DIR = Path(
+    os.environ.get(
+        "PPTX_THUMBNAIL_CACHE", Path(tempfile.gettempdir()) / "pptx_thumbnail_cache"
+    )
+)
+
+SKIPPED_RELATIONSHIPS = (
+    "/slide",
+    "/notesSlide",
+    "/notesMaster",
+    "/handoutMaster",
+    "/comments",
+    "/commentAuthors",
+    "/hyperlink",
+)
+
+PRESENTATION = "ppt/presentation.xml"
+PRESENTATION_STYLE_ELEMENTS = ("p:sldSz", "p:defaultTextStyle")
+
+
+class ThumbnailCache:
+
+    def __init__(self, cache_dir: Path = None):
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+
+    def get(self, key: str) -> Path | None:
+        path = self.cache_dir / f"{key}.jpg"
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, image_path: Path) -> Path:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.jpg"
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as tmp:
+            with open(image_path, "rb") as src:
+                shutil.copyfileobj(src, tmp)
+        os.replace(tmp.name, path)
+        return path
+
+    def prune(self, max_entries: int = MAX_ENTRIES) -> None:
+        if not self.cache_dir.exists():
+            return
+        entries = sorted(
+            self.cache_dir.glob("*.jpg"), key=lambda p: p.stat().st_mtime, reverse=True
+        )
+        for path in entries[max_entries:]:
+            path.unlink(missing_ok=True)
+
+
+def slide_keys(pptx_path: Path, slide_names: list[str], render_settings: str) -> dict:
+    # slide_names must list every slide in deck order, hidden ones included,
+    # so positions match the numbers slide-number fields display.
+    with zipfile.ZipFile(pptx_path, "r") as zf:
+        names = set(zf.namelist())
+        digests = {}
+        relationships = {}
+
+        def digest(part):
+            if part not in digests:
+                digests[part] = hashlib.sha256(zf.read(part)).hexdigest()
+            return digests[part]
+
+        def related_parts(part):
+            if part not in relationships:
+                relationships[part] = _related_parts(zf, names, part)
+            return relationships[part]
+
+        def closure_of(parts):
+            closure = set(parts)
+            stack = list(parts)
+            while stack:
+                for target in related_parts(stack.pop()):
+                    if target not in closure:
+                        closure.add(target)
+                        stack.append(target)
+            return closure
+
+        base = hashlib.sha256()
+        base.update(f"v{CACHE_VERSION}\n{render_settings}\n".encode())
+        base.update(_presentation_styles(zf.read(PRESENTATION)))
+        # Presentation-level parts (table styles, embedded fonts, presProps)
+        # can change how any slide renders. Masters are left to the slides
+        # that use them.
+        shared = closure_of(
+            part
+            for part in related_parts(PRESENTATION)
+            if not part.startswith("ppt/slideMasters/")
+        )
+        for part in sorted(shared):
+            base.update(f"{part}\0{digest(part)}\n".encode())
+
+        keys = {}
+        for position, name in enumerate(slide_names, 1):
+            slide_part = f"ppt/slides/{name}"
+            closure = closure_of([slide_part])
+
+            key = base.copy()
+            for part in sorted(closure):
+                key.update(f"{part}\0{digest(part)}\n".encode())
+            if b'type="slidenum"' in zf.read(slide_part):
+                key.update(f"position {position}\n".encode())
+            keys[name] = key.hexdigest()
+
+    return keys
+
+
+def write_partial_deck(pptx_path: Path, output_path: Path, hidden_rids: set[str]) -> None:
+    # Hiding rather than dropping the other slides keeps every rendered
+    # slide's number and position the same as in the full deck.
+    with zipfile.ZipFile(pptx_path, "r") as src, zipfile.ZipFile(
+        output_path, "w", zipfile.ZIP_DEFLATED
+    ) as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == "ppt/presentation.xml":
+                dom = defusedxml.minidom.parseString(data)
+                for sld_id in dom.getElementsByTagName("p:sldId"):
+                    if sld_id.getAttribute("r:id") in hidden_rids:
+                        sld_id.setAttribute("show", "0")
+                data = dom.toxml(encoding="UTF-8")
+            dst.writestr(info, data)
+
+
+def _presentation_styles(content: bytes) -> bytes:
+    dom = defusedxml.minidom.parseString(content)
+    styles = []
+    for tag in PRESENTATION_STYLE_ELEMENTS:
+        for elem in dom.getElementsByTagName(tag):
+            styles.append(elem.toxml())
+    return "\n".join(styles).encode()
+
+
+def _related_parts(zf: zipfile.ZipFile, names: set[str], part: str) -> list[str]:
+    directory, file_name = posixpath.split(part)
+    rels_name = posixpath.join(directory, "_rels", f"{file_name}.rels")
+    if rels_name not in names:
+        return []
+
+    is_master = posixpath.basename(directory) == "slideMasters"
+    dom = defusedxml.minidom.parseString(zf.read(rels_name))
+    targets = []
+    for rel in dom.getElementsByTagName("Relationship"):
+        rel_type = rel.getAttribute("Type")
+        if rel.getAttribute("TargetMode") == "External":
+            continue
+        if rel_type.endswith(SKIPPED_RELATIONSHIPS):
+            continue
+        if is_master and rel_type.endswith("/slideLayout"):
+            continue
+        target = rel.getAttribute("Target").split("#", 1)[0]
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        if target in names:
+            targets.append(target)
+    return targets
@@ -0,0 +1,93 @@
+"""Normalize DOCX story parts in a single pass.
+
+Applies tracked-change simplification (helpers.simplify_redlines) and run
+merging (helpers.merge_runs) over one lxml parse of each part, writing it
+back once. The walk is iterative, so deeply nested tables cannot hit the
+recursion limit:
+
+- entering a paragraph or table cell coalesces its <w:ins>/<w:del> children
+- leaving any element removes its proofErr children, strips rsid attributes
+  if it is a run, and merges its adjacent runs
+
+Story parts are the document body, headers, footers, footnotes and endnotes.
+"""
+
+import re
+from pathlib import Path
+
+from helpers.merge_runs import (
+    is_run,
+    merge_runs_in,
+    remove_proof_errors,
+    strip_run_rsid_attrs,
+)
+from helpers.simplify_redlines import merge_tracked_changes_in
+from helpers.xml_format import XmlPart, local_name
+
+STORY_PART_PATTERN = re.compile(
+    r"^word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$"
+)
+
+TRACKED_CHANGE_CONTAINERS = {"p", "tc"}
+
+
+def is_story_part(name: str) -> bool:
+    return STORY_PART_PATTERN.match(name) is not None
+
+
+def normalize_part(
+    content: bytes, merge_runs: bool = True, simplify_redlines: bool = True
+) -> tuple[bytes, int, int]:
+    part = XmlPart(content)
+    simplify_count = 0
+    merge_count = 0
+    fingerprints = {}
+
+    for event, elem in _walk(part.root):
+        if event == "start":
+            if simplify_redlines and local_name(elem) in TRACKED_CHANGE_CONTAINERS:
+                simplify_count += merge_tracked_changes_in(elem, "ins")
+                simplify_count += merge_tracked_changes_in(elem, "del")
+        elif merge_runs:
+            remove_proof_errors(elem)
+            if is_run(elem):
+                strip_run_rsid_attrs(elem)
+            merge_count += merge_runs_in(elem, fingerprints)
+
+    return part.tobytes(), simplify_count, merge_count
+
+
+def normalize_document(
+    input_dir: str, merge_runs: bool = True, simplify_redlines: bool = True
+) -> tuple[int, int]:
+    simplify_count = 0
+    merge_count = 0
+
+    for path in sorted((Path(input_dir) / "word").glob("*.xml")):
+        if not is_story_part(f"word/{path.name}"):
+            continue
+        content, simplified, merged = normalize_part(
+            path.read_bytes(), merge_runs, simplify_redlines
+        )
+        path.write_bytes(content)
+        simplify_count += simplified
+        merge_count += merged
+
+    return simplify_count, merge_count
+
+
+def _walk(root):
+    # Children are listed only after "start" has been handled, so a handler
+    # may rearrange an element's children before they are visited.
+    yield "start", root
+    stack = [(root, iter(root))]
+    while stack:
+        elem, children = stack[-1]
+        for child in children:
+            if isinstance(child.tag, str):
+                yield "start", child
+                stack.append((child, iter(child)))
+                break
+        else:
+            stack.pop()
+            yield "end", elem
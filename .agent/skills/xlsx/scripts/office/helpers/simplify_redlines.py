@@ -8,50 +8,41 @@ Rules:
 - Only merges w:ins with w:ins, w:del with w:del (same element type)
 - Only merges if same author (ignores timestamp differences)
 - Only merges if truly adjacent (only whitespace between them)
+
+Applies to the document body, headers, footers, footnotes and endnotes.
+The merging itself is driven by helpers.normalize, in the same pass as
+run merging.
 """
 
 import xml.etree.ElementTree as ET
 import zipfile
 from pathlib import Path
 
-import defusedxml.minidom
+from helpers.xml_format import local_name, remove_element
 
 WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 
 
 def simplify_redlines(input_dir: str) -> tuple[int, str]:
+    from helpers.normalize import normalize_document
+
     doc_xml = Path(input_dir) / "word" / "document.xml"
 
     if not doc_xml.exists():
         return 0, f"Error: {doc_xml} not found"
 
     try:
-        dom = defusedxml.minidom.parseString(doc_xml.read_text(encoding="utf-8"))
-        root = dom.documentElement
-
-        merge_count = 0
-
-        containers = _find_elements(root, "p") + _find_elements(root, "tc")
-
-        for container in containers:
-            merge_count += _merge_tracked_changes_in(container, "ins")
-            merge_count += _merge_tracked_changes_in(container, "del")
-
-        doc_xml.write_bytes(dom.toxml(encoding="UTF-8"))
+        merge_count, _ = normalize_document(input_dir, merge_runs=False)
         return merge_count, f"Simplified {merge_count} tracked changes"
 
     except Exception as e:
         return 0, f"Error: {e}"
 
 
-def _merge_tracked_changes_in(container, tag: str) -> int:
+def merge_tracked_changes_in(container, tag: str) -> int:
     merge_count = 0
 
-    tracked = [
-        child
-        for child in container.childNodes
-        if child.nodeType == child.ELEMENT_NODE and _is_element(child, tag)
-    ]
+    tracked = [child for child in container if _is_element(child, tag)]
 
     if len(tracked) < 2:
         return 0
@@ -63,7 +54,7 @@ def _merge_tracked_changes_in(container, tag: str) -> int:
 
         if _can_merge_tracked(curr, next_elem):
             _merge_tracked_content(curr, next_elem)
-            container.removeChild(next_elem)
+            remove_element(next_elem)
             tracked.pop(i + 1)
             merge_count += 1
         else:
@@ -73,54 +64,45 @@ def _merge_tracked_changes_in(container, tag: str) -> int:
 
 
 def _is_element(node, tag: str) -> bool:
-    name = node.localName or node.tagName
-    return name == tag or name.endswith(f":{tag}")
+    return isinstance(node.tag, str) and local_name(node) == tag
 
 
 def _get_author(elem) -> str:
-    author = elem.getAttribute("w:author")
+    author = elem.get(f"{{{WORD_NS}}}author")
     if not author:
-        for attr in elem.attributes.values():
-            if attr.localName == "author" or attr.name.endswith(":author"):
-                return attr.value
-    return author
+        for key, value in elem.attrib.items():
+            if key.rpartition("}")[2] == "author":
+                return value
+    return author or ""
+
+
+def _is_blank(text) -> bool:
+    return not text or not text.strip()
 
 
 def _can_merge_tracked(elem1, elem2) -> bool:
     if _get_author(elem1) != _get_author(elem2):
         return False
 
-    node = elem1.nextSibling
-    while node and node != elem2:
-        if node.nodeType == node.ELEMENT_NODE:
-            return False
-        if node.nodeType == node.TEXT_NODE and node.data.strip():
+    if not _is_blank(elem1.tail):
+        return False
+    node = elem1.getnext()
+    while node is not None and node is not elem2:
+        if isinstance(node.tag, str) or not _is_blank(node.tail):
             return False
-        node = node.nextSibling
+        node = node.getnext()
 
     return True
 
 
 def _merge_tracked_content(target, source):
-    while source.firstChild:
-        child = source.firstChild
-        source.removeChild(child)
-        target.appendChild(child)
-
-
-def _find_elements(root, tag: str) -> list:
-    results = []
-
-    def traverse(node):
-        if node.nodeType == node.ELEMENT_NODE:
-            name = node.localName or node.tagName
-            if name == tag or name.endswith(f":{tag}"):
-                results.append(node)
-            for child in node.childNodes:
-                traverse(child)
-
-    traverse(root)
-    return results
+    if source.text:
+        if len(target):
+            target[-1].tail = (target[-1].tail or "") + source.text
+        else:
+            target.text = (target.text or "") + source.text
+    for child in list(source):
+        target.append(child)
 
 
 def get_tracked_change_authors(doc_xml_path: Path) -> dict[str, int]:
@@ -3,23 +3,22 @@
 Validates with auto-repair, condenses XML formatting, and creates the Office file.
 
 Usage:
-    python pack.py <input_directory> <output_file> [--original <file>] [--validate true|false]
+    python pack.py <input_directory> <output_file> [--original <file>] [--validate true|false] [--jobs N] [--cache true|false] [--stream true|false] [--compress-level 0-9]
 
 Examples:
     python pack.py unpacked/ output.docx --original input.docx
     python pack.py unpacked/ output.pptx --validate false
+    python pack.py unpacked/ output.pptx --validate false --compress-level 1
 """
 
 import argparse
 import sys
-import shutil
-import tempfile
-import zipfile
 from pathlib import Path
 
-import defusedxml.minidom
-
+from helpers.package import iter_directory_parts, write_zip
+from helpers.xml_format import condense_xml
 from validators import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from validators.base import VALIDATION_CACHE_NAME
 
 def pack(
     input_directory: str,
@@ -27,6 +26,10 @@ def pack(
     original_file: str | None = None,
     validate: bool = True,
     infer_author_func=None,
+    jobs: int = 1,
+    cache: bool = False,
+    streaming: bool = False,
+    compress_level: int | None = None,
 ) -> tuple[None, str]:
     input_dir = Path(input_directory)
     output_path = Path(output_file)
@@ -42,26 +45,26 @@ def pack(
         original_path = Path(original_file)
         if original_path.exists():
             success, output = _run_validation(
-                input_dir, original_path, suffix, infer_author_func
+                input_dir,
+                original_path,
+                suffix,
+                infer_author_func,
+                jobs,
+                cache,
+                streaming,
             )
             if output:
                 print(output)
             if not success:
                 return None, f"Error: Validation failed for {input_dir}"
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                _condense_xml(xml_file)
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_zip(
+        output_path,
+        iter_directory_parts(input_dir, exclude={VALIDATION_CACHE_NAME}),
+        transform=_condense_xml,
+        compress_level=compress_level,
+    )
 
     return None, f"Successfully packed {input_dir} to {output_file}"
 
@@ -71,6 +74,9 @@ def _run_validation(
     original_file: Path,
     suffix: str,
     infer_author_func=None,
+    jobs: int = 1,
+    cache: bool = False,
+    streaming: bool = False,
 ) -> tuple[bool, str | None]:
     output_lines = []
     validators = []
@@ -84,11 +90,25 @@ def _run_validation(
                 print(f"Warning: {e} Using default author 'Claude'.", file=sys.stderr)
 
         validators = [
-            DOCXSchemaValidator(unpacked_dir, original_file),
+            DOCXSchemaValidator(
+                unpacked_dir,
+                original_file,
+                jobs=jobs,
+                cache=cache,
+                streaming=streaming,
+            ),
             RedliningValidator(unpacked_dir, original_file, author=author),
         ]
     elif suffix == ".pptx":
-        validators = [PPTXSchemaValidator(unpacked_dir, original_file)]
+        validators = [
+            PPTXSchemaValidator(
+                unpacked_dir,
+                original_file,
+                jobs=jobs,
+                cache=cache,
+                streaming=streaming,
+            )
+        ]
 
     if not validators:
         return True, None
@@ -105,26 +125,11 @@ def _run_validation(
     return success, "\n".join(output_lines) if output_lines else None
 
 
-def _condense_xml(xml_file: Path) -> None:
+def _condense_xml(content: bytes, name: str) -> bytes:
     try:
-        with open(xml_file, encoding="utf-8") as f:
-            dom = defusedxml.minidom.parse(f)
-
-        for element in dom.getElementsByTagName("*"):
-            if element.tagName.endswith(":t"):
-                continue
-
-            for child in list(element.childNodes):
-                if (
-                    child.nodeType == child.TEXT_NODE
-                    and child.nodeValue
-                    and child.nodeValue.strip() == ""
-                ) or child.nodeType == child.COMMENT_NODE:
-                    element.removeChild(child)
-
-        xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+        return condense_xml(content)
     except Exception as e:
-        print(f"ERROR: Failed to parse {xml_file.name}: {e}", file=sys.stderr)
+        print(f"ERROR: Failed to parse {Path(name).name}: {e}", file=sys.stderr)
         raise
 
 
@@ -145,6 +150,35 @@ if __name__ == "__main__":
         metavar="true|false",
         help="Run validation with auto-repair (default: true)",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for per-part validation (default: 1)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=lambda x: x.lower() == "true",
+        default=False,
+        metavar="true|false",
+        help="Reuse validation results for unchanged parts across runs (default: false)",
+    )
+    parser.add_argument(
+        "--stream",
+        type=lambda x: x.lower() == "true",
+        default=False,
+        metavar="true|false",
+        help="Stream large parts during validation to bound memory (default: false)",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        choices=range(10),
+        default=None,
+        metavar="0-9",
+        help="Deflate level for XML and other compressible parts (default: zlib default)",
+    )
     args = parser.parse_args()
 
     _, message = pack(
@@ -152,6 +186,10 @@ if __name__ == "__main__":
         args.output_file,
         original_file=args.original,
         validate=args.validate,
+        jobs=args.jobs,
+        cache=args.cache,
+        streaming=args.stream,
+        compress_level=args.compress_level,
     )
     print(message)
 
@@ -4,13 +4,171 @@ Validator for Word document XML files against XSD schemas.
 
 import random
 import re
-import tempfile
-import zipfile
 
 import defusedxml.minidom
 import lxml.etree
 
 from .base import BaseSchemaValidator
+from .rules import Rule
+
+
+def _text_preview(text):
+    return repr(text)[:50] + "..." if len(repr(text)) > 50 else repr(text)
+
+
+class WhitespacePreservationRule(Rule):
+
+    name = "whitespace"
+    event = "end"
+
+    def __init__(self, validator, xml_file):
+        super().__init__(validator, xml_file)
+        self.tags = {f"{{{validator.WORD_2006_NAMESPACE}}}t"}
+        self.xml_space_attr = f"{{{validator.XML_NAMESPACE}}}space"
+
+    @classmethod
+    def applies_to(cls, xml_file):
+        return xml_file.name == "document.xml"
+
+    def visit(self, elem, context):
+        text = elem.text
+        if not text:
+            return
+        if not (re.search(r"^[ \t\n\r]", text) or re.search(r"[ \t\n\r]$", text)):
+            return
+        if elem.attrib.get(self.xml_space_attr) != "preserve":
+            self.errors.append(
+                f"  {self.xml_file.relative_to(self.validator.unpacked_dir)}: "
+                f"Line {elem.sourceline}: w:t element with whitespace missing xml:space='preserve': {_text_preview(text)}"
+            )
+
+
+class DeletionsRule(Rule):
+
+    name = "deletions"
+    event = "end"
+
+    def __init__(self, validator, xml_file):
+        super().__init__(validator, xml_file)
+        w = validator.WORD_2006_NAMESPACE
+        self.t_tag = f"{{{w}}}t"
+        self.del_tag = f"{{{w}}}del"
+        self.tags = {self.t_tag, f"{{{w}}}instrText"}
+        self.instr_errors = []
+
+    @classmethod
+    def applies_to(cls, xml_file):
+        return xml_file.name == "document.xml"
+
+    def visit(self, elem, context):
+        if not context.inside(self.del_tag):
+            return
+
+        relative_path = self.xml_file.relative_to(self.validator.unpacked_dir)
+        if elem.tag == self.t_tag:
+            if elem.text:
+                self.errors.append(
+                    f"  {relative_path}: "
+                    f"Line {elem.sourceline}: <w:t> found within <w:del>: {_text_preview(elem.text)}"
+                )
+        else:
+            self.instr_errors.append(
+                f"  {relative_path}: "
+                f"Line {elem.sourceline}: <w:instrText> found within <w:del> (use <w:delInstrText>): {_text_preview(elem.text or '')}"
+            )
+
+    def result(self):
+        return self.errors + self.instr_errors
+
+
+class InsertionsRule(Rule):
+
+    name = "insertions"
+    event = "end"
+
+    def __init__(self, validator, xml_file):
+        super().__init__(validator, xml_file)
+        w = validator.WORD_2006_NAMESPACE
+        self.ins_tag = f"{{{w}}}ins"
+        self.del_tag = f"{{{w}}}del"
+        self.tags = {f"{{{w}}}delText"}
+
+    @classmethod
+    def applies_to(cls, xml_file):
+        return xml_file.name == "document.xml"
+
+    def visit(self, elem, context):
+        if context.inside(self.ins_tag) and not context.inside(self.del_tag):
+            self.errors.append(
+                f"  {self.xml_file.relative_to(self.validator.unpacked_dir)}: "
+                f"Line {elem.sourceline}: <w:delText> within <w:ins>: {_text_preview(elem.text or '')}"
+            )
+
+
+class ParagraphCountRule(Rule):
+
+    name = "paragraphs"
+
+    def __init__(self, validator, xml_file):
+        super().__init__(validator, xml_file)
+        self.tags = {f"{{{validator.WORD_2006_NAMESPACE}}}p"}
+        self.count = 0
+
+    @classmethod
+    def applies_to(cls, xml_file):
+        return xml_file.name == "document.xml"
+
+    def visit(self, elem, context):
+        self.count += 1
+
+    def on_error(self, error):
+        self.errors.append(str(error))
+
+    def result(self):
+        return self.errors if self.errors else self.count
+
+
+class IdConstraintsRule(Rule):
+
+    name = "id_constraints"
+
+    def __init__(self, validator, xml_file):
+        super().__init__(validator, xml_file)
+        self.para_id_attr = f"{{{validator.W14_NAMESPACE}}}paraId"
+        self.durable_id_attr = f"{{{validator.W16CID_NAMESPACE}}}durableId"
+
+    def visit(self, elem, context):
+        validator = self.validator
+        name = self.xml_file.name
+
+        if val := elem.get(self.para_id_attr):
+            if validator._parse_id_value(val, base=16) >= 0x80000000:
+                self.errors.append(
+                    f"  {name}:{elem.sourceline}: paraId={val} >= 0x80000000"
+                )
+
+        if val := elem.get(self.durable_id_attr):
+            if name == "numbering.xml":
+                try:
+                    if validator._parse_id_value(val, base=10) >= 0x7FFFFFFF:
+                        self.errors.append(
+                            f"  {name}:{elem.sourceline}: "
+                            f"durableId={val} >= 0x7FFFFFFF"
+                        )
+                except ValueError:
+                    self.errors.append(
+                        f"  {name}:{elem.sourceline}: "
+                        f"durableId={val} must be decimal in numbering.xml"
+                    )
+            else:
+                if validator._parse_id_value(val, base=16) >= 0x7FFFFFFF:
+                    self.errors.append(
+                        f"  {name}:{elem.sourceline}: "
+                        f"durableId={val} >= 0x7FFFFFFF"
+                    )
+
+    def on_error(self, error):
+        pass
 
 
 class DOCXSchemaValidator(BaseSchemaValidator):
@@ -21,10 +179,20 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
     ELEMENT_RELATIONSHIP_TYPES = {}
 
+    RULES = BaseSchemaValidator.RULES + (
+        WhitespacePreservationRule,
+        DeletionsRule,
+        InsertionsRule,
+        IdConstraintsRule,
+        ParagraphCountRule,
+    )
+
     def validate(self):
         if not self.validate_xml():
             return False
 
+        self.prefetch_part_checks()
+
         all_valid = True
         if not self.validate_namespaces():
             all_valid = False
@@ -61,43 +229,14 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
         self.compare_paragraph_counts()
 
+        self.save_part_cache()
         return all_valid
 
     def validate_whitespace_preservation(self):
         errors = []
 
         for xml_file in self.xml_files:
-            if xml_file.name != "document.xml":
-                continue
-
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-
-                for elem in root.iter(f"{{{self.WORD_2006_NAMESPACE}}}t"):
-                    if elem.text:
-                        text = elem.text
-                        if re.search(r"^[ \t\n\r]", text) or re.search(
-                            r"[ \t\n\r]$", text
-                        ):
-                            xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
-                            if (
-                                xml_space_attr not in elem.attrib
-                                or elem.attrib[xml_space_attr] != "preserve"
-                            ):
-                                text_preview = (
-                                    repr(text)[:50] + "..."
-                                    if len(repr(text)) > 50
-                                    else repr(text)
-                                )
-                                errors.append(
-                                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                    f"Line {elem.sourceline}: w:t element with whitespace missing xml:space='preserve': {text_preview}"
-                                )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+            errors.extend(self._rule_result("whitespace", xml_file))
 
         if errors:
             print(f"FAILED - Found {len(errors)} whitespace preservation violations:")
@@ -113,42 +252,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         errors = []
 
         for xml_file in self.xml_files:
-            if xml_file.name != "document.xml":
-                continue
-
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-
-                for t_elem in root.xpath(".//w:del//w:t", namespaces=namespaces):
-                    if t_elem.text:
-                        text_preview = (
-                            repr(t_elem.text)[:50] + "..."
-                            if len(repr(t_elem.text)) > 50
-                            else repr(t_elem.text)
-                        )
-                        errors.append(
-                            f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                            f"Line {t_elem.sourceline}: <w:t> found within <w:del>: {text_preview}"
-                        )
-
-                for instr_elem in root.xpath(
-                    ".//w:del//w:instrText", namespaces=namespaces
-                ):
-                    text_preview = (
-                        repr(instr_elem.text or "")[:50] + "..."
-                        if len(repr(instr_elem.text or "")) > 50
-                        else repr(instr_elem.text or "")
-                    )
-                    errors.append(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Line {instr_elem.sourceline}: <w:instrText> found within <w:del> (use <w:delInstrText>): {text_preview}"
-                    )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+            errors.extend(self._rule_result("deletions", xml_file))
 
         if errors:
             print(f"FAILED - Found {len(errors)} deletion validation violations:")
@@ -167,12 +271,12 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
-            except Exception as e:
-                print(f"Error counting paragraphs in unpacked document: {e}")
+            result = self._rule_result("paragraphs", xml_file)
+            if isinstance(result, int):
+                count = result
+            else:
+                for error in result:
+                    print(f"Error counting paragraphs in unpacked document: {error}")
 
         return count
 
@@ -184,15 +288,13 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         count = 0
 
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                with zipfile.ZipFile(original, "r") as zip_ref:
-                    zip_ref.extractall(temp_dir)
+            content = self.original_package.read("word/document.xml")
+            if content is None:
+                raise KeyError(f"word/document.xml not found in {original}")
 
-                doc_xml_path = temp_dir + "/word/document.xml"
-                root = lxml.etree.parse(doc_xml_path).getroot()
-
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+            root = lxml.etree.fromstring(content)
+            paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
+            count = len(paragraphs)
 
         except Exception as e:
             print(f"Error counting paragraphs in original document: {e}")
@@ -203,32 +305,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         errors = []
 
         for xml_file in self.xml_files:
-            if xml_file.name != "document.xml":
-                continue
-
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-
-                invalid_elements = root.xpath(
-                    ".//w:ins//w:delText[not(ancestor::w:del)]", namespaces=namespaces
-                )
-
-                for elem in invalid_elements:
-                    text_preview = (
-                        repr(elem.text or "")[:50] + "..."
-                        if len(repr(elem.text or "")) > 50
-                        else repr(elem.text or "")
-                    )
-                    errors.append(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Line {elem.sourceline}: <w:delText> within <w:ins>: {text_preview}"
-                    )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+            errors.extend(self._rule_result("insertions", xml_file))
 
         if errors:
             print(f"FAILED - Found {len(errors)} insertion validation violations:")
@@ -253,39 +330,9 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
     def validate_id_constraints(self):
         errors = []
-        para_id_attr = f"{{{self.W14_NAMESPACE}}}paraId"
-        durable_id_attr = f"{{{self.W16CID_NAMESPACE}}}durableId"
 
         for xml_file in self.xml_files:
-            try:
-                for elem in lxml.etree.parse(str(xml_file)).iter():
-                    if val := elem.get(para_id_attr):
-                        if self._parse_id_value(val, base=16) >= 0x80000000:
-                            errors.append(
-                                f"  {xml_file.name}:{elem.sourceline}: paraId={val} >= 0x80000000"
-                            )
-
-                    if val := elem.get(durable_id_attr):
-                        if xml_file.name == "numbering.xml":
-                            try:
-                                if self._parse_id_value(val, base=10) >= 0x7FFFFFFF:
-                                    errors.append(
-                                        f"  {xml_file.name}:{elem.sourceline}: "
-                                        f"durableId={val} >= 0x7FFFFFFF"
-                                    )
-                            except ValueError:
-                                errors.append(
-                                    f"  {xml_file.name}:{elem.sourceline}: "
-                                    f"durableId={val} must be decimal in numbering.xml"
-                                )
-                        else:
-                            if self._parse_id_value(val, base=16) >= 0x7FFFFFFF:
-                                errors.append(
-                                    f"  {xml_file.name}:{elem.sourceline}: "
-                                    f"durableId={val} >= 0x7FFFFFFF"
-                                )
-            except Exception:
-                pass
+            errors.extend(self._rule_result("id_constraints", xml_file))
 
         if errors:
             print(f"FAILED - {len(errors)} ID constraint violations:")
@@ -312,27 +359,18 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             return True
 
         try:
-            doc_root = lxml.etree.parse(str(document_xml)).getroot()
             namespaces = {"w": self.WORD_2006_NAMESPACE}
+            id_attr = f"{{{self.WORD_2006_NAMESPACE}}}id"
 
-            range_starts = {
-                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
-                for elem in doc_root.xpath(
-                    ".//w:commentRangeStart", namespaces=namespaces
-                )
-            }
-            range_ends = {
-                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
-                for elem in doc_root.xpath(
-                    ".//w:commentRangeEnd", namespaces=namespaces
-                )
-            }
-            references = {
-                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
-                for elem in doc_root.xpath(
-                    ".//w:commentReference", namespaces=namespaces
-                )
+            markers = {
+                f"{{{self.WORD_2006_NAMESPACE}}}commentRangeStart": set(),
+                f"{{{self.WORD_2006_NAMESPACE}}}commentRangeEnd": set(),
+                f"{{{self.WORD_2006_NAMESPACE}}}commentReference": set(),
             }
+            for elem in self._iter_elements(document_xml):
+                if elem.tag in markers:
+                    markers[elem.tag].add(elem.get(id_attr))
+            range_starts, range_ends, references = markers.values()
 
             orphaned_ends = range_ends - range_starts
             for comment_id in sorted(
@@ -352,7 +390,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
             comment_ids = set()
             if comments_xml and comments_xml.exists():
-                comments_root = lxml.etree.parse(str(comments_xml)).getroot()
+                comments_root = self._parse(comments_xml).getroot()
                 comment_ids = {
                     elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
                     for elem in comments_root.xpath(
@@ -435,6 +473,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
                 if modified:
                     xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+                    self._invalidate(xml_file)
 
             except Exception:
                 pass
@@ -1,18 +1,27 @@
 """
 Excel Formula Recalculation Script
 Recalculates all formulas in an Excel file using LibreOffice
+
+With --batch, recalculates a list of files or directories through one
+LibreOffice session and prints one JSON line per workbook as it finishes.
 """
 
+import argparse
+import itertools
 import json
 import os
 import platform
+import posixpath
 import subprocess
 import sys
+import zipfile
+from concurrent.futures import as_completed
 from pathlib import Path
 
-from office.soffice import get_soffice_env
+from office.soffice import SofficePool, get_soffice_env, worker_available
 
-from openpyxl import load_workbook
+from lxml import etree
+from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter
 
 MACRO_DIR_MACOS = "~/Library/Application Support/LibreOffice/4/user/basic/Standard"
 MACRO_DIR_LINUX = "~/.config/libreoffice/4/user/basic/Standard"
@@ -67,12 +76,23 @@ def setup_libreoffice_macro():
         return False
 
 
-def recalc(filename, timeout=30):
+def recalculate_with_worker(worker, path):
+    worker.process_document(path, lambda worker, document: document.calculateAll())
+
+
+def recalc(filename, timeout=30, pool=None):
     if not Path(filename).exists():
         return {"error": f"File {filename} does not exist"}
 
     abs_path = str(Path(filename).absolute())
 
+    if pool is not None:
+        try:
+            pool.submit(recalculate_with_worker, abs_path).result()
+        except Exception as e:
+            return {"error": f"LibreOffice recalculation failed: {e}"}
+        return scan_workbook(filename)
+
     if not setup_libreoffice_macro():
         return {"error": "Failed to setup LibreOffice macro"}
 
@@ -97,62 +117,83 @@ def recalc(filename, timeout=30):
             return {"error": "LibreOffice macro not configured properly"}
         return {"error": error_msg}
 
+    return scan_workbook(filename)
+
+
+EXCEL_ERRORS = [
+    "#VALUE!",
+    "#DIV/0!",
+    "#REF!",
+    "#NAME?",
+    "#NULL!",
+    "#NUM!",
+    "#N/A",
+]
+
+WORKBOOK_SUFFIXES = (".xlsx", ".xlsm")
+
+_XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, load_dtd=False)
+
+
+MAX_LOCATIONS = 20
+
+SHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+_ROW = f"{{{SHEET_NS}}}row"
+_VALUE = f"{{{SHEET_NS}}}v"
+_FORMULA = f"{{{SHEET_NS}}}f"
+_INLINE_STRING = f"{{{SHEET_NS}}}is"
+_STRING_ITEM = f"{{{SHEET_NS}}}si"
+_TEXT = f"{{{SHEET_NS}}}t"
+_RICH_TEXT_RUN = f"{{{SHEET_NS}}}r"
+
+
+def scan_workbook(filename):
+    # Streams each worksheet's XML once, reading a cell's cached value and its
+    # formula together. Values match what openpyxl reports for data_only=True
+    # (errors) and data_only=False (formulas). Only shared strings that contain
+    # an error or start with "=" are kept, and at most MAX_LOCATIONS locations
+    # per error type, so memory does not grow with sheet size.
     try:
-        wb = load_workbook(filename, data_only=True)
-
-        excel_errors = [
-            "#VALUE!",
-            "#DIV/0!",
-            "#REF!",
-            "#NAME?",
-            "#NULL!",
-            "#NUM!",
-            "#N/A",
-        ]
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
-
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
-
-        wb.close()
+        error_counts = {err: 0 for err in EXCEL_ERRORS}
+        error_locations = {err: [] for err in EXCEL_ERRORS}
+        formula_count = 0
+
+        with zipfile.ZipFile(filename) as zf:
+            sheets, shared_strings_part = _workbook_parts(zf)
+            string_errors, string_formulas = {}, set()
+            if shared_strings_part is not None:
+                with zf.open(shared_strings_part) as source:
+                    string_errors, string_formulas = _scan_shared_strings(source)
+
+            for sheet_name, part in sheets:
+
+                def record(error, coordinate, sheet_name=sheet_name):
+                    error_counts[error] += 1
+                    if len(error_locations[error]) < MAX_LOCATIONS:
+                        error_locations[error].append(f"{sheet_name}!{coordinate}")
+
+                with zf.open(part) as source:
+                    formula_count += _scan_sheet(
+                        source, string_errors, string_formulas, record
+                    )
 
+        total_errors = sum(error_counts.values())
         result = {
             "status": "success" if total_errors == 0 else "errors_found",
             "total_errors": total_errors,
             "error_summary": {},
         }
 
-        for err_type, locations in error_details.items():
-            if locations:
+        for err_type, count in error_counts.items():
+            if count:
                 result["error_summary"][err_type] = {
-                    "count": len(locations),
-                    "locations": locations[:20],  
+                    "count": count,
+                    "locations": error_locations[err_type],
                 }
 
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if (
-                        cell.value
-                        and isinstance(cell.value, str)
-                        and cell.value.startswith("=")
-                    ):
-                        formula_count += 1
-        wb_formulas.close()
-
         result["total_formulas"] = formula_count
 
         return result
@@ -161,9 +202,251 @@ def recalc(filename, timeout=30):
         return {"error": str(e)}
 
 
+def _find_error(text):
+    for err in EXCEL_ERRORS:
+        if err in text:
+            return err
+    return None
+
+
+def _iterparse(source, tag):
+    return etree.iterparse(
+        source,
+        events=("end",),
+        tag=tag,
+        resolve_entities=False,
+        no_network=True,
+        load_dtd=False,
+        huge_tree=True,
+    )
+
+
+def _release(elem):
+    # Drop the element and everything parsed before it so memory stays flat.
+    elem.clear()
+    parent = elem.getparent()
+    while elem.getprevious() is not None:
+        del parent[0]
+
+
+def _text_content(elem):
+    # Same as openpyxl's Text.content: plain text plus rich-text runs,
+    # without phonetic hints.
+    snippets = []
+    text = elem.find(_TEXT)
+    if text is not None and text.text:
+        snippets.append(text.text)
+    for run in elem.iterchildren(_RICH_TEXT_RUN):
+        text = run.find(_TEXT)
+        if text is not None and text.text:
+            snippets.append(text.text)
+    return "".join(snippets)
+
+
+def _resolve_target(base, target):
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), target))
+
+
+def _relationships(zf, part):
+    rels_part = posixpath.join(
+        posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels"
+    )
+    if rels_part not in zf.namelist():
+        return []
+    root = etree.fromstring(zf.read(rels_part), _XML_PARSER)
+    return [
+        (rel.get("Id"), rel.get("Type", ""), _resolve_target(part, rel.get("Target", "")))
+        for rel in root.iterchildren(f"{{{REL_NS}}}Relationship")
+    ]
+
+
+def _workbook_parts(zf):
+    workbook_part = "xl/workbook.xml"
+    for _, rel_type, target in _relationships(zf, ""):
+        if rel_type.endswith("/officeDocument"):
+            workbook_part = target
+
+    rels = _relationships(zf, workbook_part)
+    targets = {rel_id: target for rel_id, rel_type, target in rels if rel_type.endswith("/worksheet")}
+    shared_strings = next(
+        (target for _, rel_type, target in rels if rel_type.endswith("/sharedStrings")),
+        None,
+    )
+
+    root = etree.fromstring(zf.read(workbook_part), _XML_PARSER)
+    sheets = [
+        (sheet.get("name"), targets[sheet.get(f"{{{DOC_REL_NS}}}id")])
+        for sheet in root.iter(f"{{{SHEET_NS}}}sheet")
+        if sheet.get(f"{{{DOC_REL_NS}}}id") in targets
+    ]
+    return sheets, shared_strings
+
+
+def _scan_shared_strings(source):
+    errors = {}
+    formulas = set()
+    for index, (_, item) in enumerate(_iterparse(source, _STRING_ITEM)):
+        text = _text_content(item).replace("x005F_", "")
+        error = _find_error(text)
+        if error is not None:
+            errors[index] = error
+        if text.startswith("="):
+            formulas.add(index)
+        _release(item)
+    return errors, formulas
+
+
+def _scan_sheet(source, string_errors, string_formulas, on_error):
+    # Calls on_error(error, coordinate) for each error cell and returns the
+    # number of formula cells.
+    formula_count = 0
+    row_number = 0
+    for _, row in _iterparse(source, _ROW):
+        row_ref = row.get("r")
+        row_number = int(float(row_ref)) if row_ref else row_number + 1
+
+        for cell in row:
+            formula = value = inline = None
+            for child in cell:
+                tag = child.tag
+                if tag == _FORMULA:
+                    formula = child
+                elif tag == _VALUE:
+                    value = child.text
+                elif tag == _INLINE_STRING:
+                    inline = child
+
+            if formula is not None and formula.get("t") not in ("array", "dataTable"):
+                formula_count += 1
+
+            cell_type = cell.get("t")
+            if cell_type == "s":
+                if not value:
+                    continue
+                error = string_errors.get(int(value))
+                if formula is None and int(value) in string_formulas:
+                    formula_count += 1
+            elif cell_type in ("str", "e", "inlineStr"):
+                if cell_type == "inlineStr":
+                    value = _text_content(inline) if inline is not None else None
+                if not value:
+                    continue
+                error = _find_error(value)
+                if formula is None and value.startswith("="):
+                    formula_count += 1
+            else:
+                continue
+
+            if error is not None:
+                on_error(error, _coordinate(cell, row_number))
+
+        _release(row)
+
+    return formula_count
+
+
+def _coordinate(cell, row_number):
+    # Cells without an r attribute follow the previous cell in the row, as
+    # in openpyxl's reader.
+    offset = 1
+    for node in itertools.chain([cell], cell.itersiblings(preceding=True)):
+        ref = node.get("r")
+        if ref:
+            row_number, column = coordinate_to_tuple(ref)
+            return f"{get_column_letter(column + offset - 1)}{row_number}"
+        offset += 1
+    return f"{get_column_letter(offset - 1)}{row_number}"
+
+
+def find_workbooks(paths):
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(
+                sorted(
+                    p for p in path.iterdir()
+                    if p.suffix.lower() in WORKBOOK_SUFFIXES and not p.name.startswith("~$")
+                )
+            )
+        else:
+            files.append(path)
+    return [str(f) for f in files]
+
+
+def recalc_batch(paths, timeout=30, workers=1):
+    files = find_workbooks(paths)
+    pending = []
+    for filename in files:
+        if Path(filename).exists():
+            pending.append(filename)
+        else:
+            yield filename, {"error": f"File {filename} does not exist"}
+
+    pool = None
+    if pending and worker_available():
+        pool = SofficePool(size=min(workers, len(pending)), job_timeout=timeout)
+        try:
+            # start() stops any workers it brought up before raising.
+            pool.start()
+        except Exception:
+            pool = None
+
+    if pool is None:
+        for filename in pending:
+            try:
+                yield filename, recalc(filename, timeout)
+            except Exception as e:
+                yield filename, {"error": str(e)}
+        return
+
+    try:
+        futures = {
+            pool.submit(recalculate_with_worker, str(Path(filename).absolute())): filename
+            for filename in pending
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                yield filename, {"error": f"LibreOffice recalculation failed: {e}"}
+                continue
+            yield filename, scan_workbook(filename)
+    finally:
+        pool.close()
+
+
+def main_batch(args):
+    parser = argparse.ArgumentParser(
+        prog="recalc.py --batch",
+        description="Recalculate many Excel files in one LibreOffice session",
+    )
+    parser.add_argument("paths", nargs="+", help="Excel files or directories of them")
+    parser.add_argument(
+        "--timeout", type=int, default=30, help="Seconds allowed per file (default: 30)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="LibreOffice processes to run in parallel (default: 1)",
+    )
+    args = parser.parse_args(args)
+
+    for filename, result in recalc_batch(args.paths, args.timeout, max(1, args.workers)):
+        print(json.dumps({"file": filename, **result}), flush=True)
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        main_batch(sys.argv[2:])
+        return
+
     if len(sys.argv) < 2:
         print("Usage: python recalc.py <excel_file> [timeout_seconds]")
+        print("       python recalc.py --batch <file_or_dir>... [--timeout N] [--workers N]")
         print("\nRecalculates all formulas in an Excel file using LibreOffice")
         print("\nReturns JSON with error details:")
         print("  - status: 'success' or 'errors_found'")
@@ -171,6 +454,7 @@ def main():
         print("  - total_formulas: Number of formulas in the file")
         print("  - error_summary: Breakdown by error type with locations")
         print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
+        print("\nWith --batch, prints one JSON line per workbook as each finishes")
         sys.exit(1)
 
     filename = sys.argv[1]